@@ -0,0 +1,256 @@
+import json
+
+import numpy as np
+
+from engine import ArrayEngine, Snapshot
+
+
+def _lookup(sorted_ids: np.ndarray, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find ids in a sorted array of ids.
+    :param sorted_ids: np.ndarray
+    :param ids: np.ndarray
+    :return: tuple of the index of each id and whether it was found
+    """
+    if len(sorted_ids) == 0:
+        return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+    index = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return index, sorted_ids[index] == ids
+
+
+class RunningStatistic:
+    """
+    Running mean and variance of a stream of values, using Welford's algorithm.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create an empty statistic.
+        :return: None
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.__m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """
+        Add a single value to the statistic.
+        :param value: float
+        :return: None
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.__m2 += delta * (value - self.mean)
+
+    def add_batch(self, values: np.ndarray) -> None:
+        """
+        Add many values at once by merging their mean and variance into the statistic.
+        :param values: np.ndarray
+        :return: None
+        """
+        count = values.size
+        if count == 0:
+            return
+        mean = float(values.mean())
+        m2 = float(np.sum((values - mean) ** 2))
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.__m2 += m2 + delta**2 * self.count * count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the values added so far."""
+        if self.count < 2:
+            return 0.0
+        return self.__m2 / (self.count - 1)
+
+    def summary(self) -> dict[str, float]:
+        """
+        The statistic as a dictionary.
+        :return: dict
+        """
+        return {"count": self.count, "mean": self.mean, "variance": self.variance}
+
+
+class Analytics:
+    """
+    Physical statistics of a simulation, updated incrementally after every step.
+    """
+
+    # walls in the order they are stored in wall_impulse
+    walls = ("right", "top", "left", "bottom")
+
+    def __init__(
+        self,
+        window_size: tuple[int, int],
+        speed_bins: int = 25,
+        max_speed: float = 50.0,
+        dump_file: str | None = None,
+        dump_every: int = 0,
+    ) -> None:
+        """
+        Create a new analytics stage.
+        Speeds above max_speed are counted in the last histogram bin.
+        When dump_file is set, the summary is written to it every dump_every steps.
+        :param window_size: tuple[int, int]
+        :param speed_bins: int
+        :param max_speed: float
+        :param dump_file: str or None
+        :param dump_every: int
+        :return: None
+        """
+        if not isinstance(window_size, tuple):
+            raise TypeError("window_size parameter must be a tuple.")
+        if not isinstance(speed_bins, int):
+            raise TypeError("speed_bins parameter must be an integer.")
+        if not isinstance(max_speed, float):
+            raise TypeError("max_speed parameter must be a float.")
+        if not isinstance(dump_file, (str, type(None))):
+            raise TypeError("dump_file parameter must be a string or None.")
+        if not isinstance(dump_every, int):
+            raise TypeError("dump_every parameter must be an integer.")
+        if speed_bins < 1 or max_speed <= 0:
+            raise ValueError("speed_bins and max_speed must be positive.")
+
+        self.width = window_size[0]
+        self.height = window_size[1]
+        self.steps = 0
+        self.elapsed_time = 0.0
+        self.kinetic_energy = RunningStatistic()
+        self.momentum_x = RunningStatistic()
+        self.momentum_y = RunningStatistic()
+        self.speed = RunningStatistic()
+        self.collisions = 0
+        self.collisions_per_step = RunningStatistic()
+        self.max_speed = max_speed
+        self.speed_histogram = np.zeros(speed_bins, dtype=np.int64)
+        # collision counts of the balls in the last step, sorted by ball id, so
+        # balls that have been removed are forgotten
+        self.ball_ids = np.zeros(0, dtype=np.int64)
+        self.ball_collisions = np.zeros(0, dtype=np.int64)
+        # collision counts by quadrant
+        self.quadrant_collisions = np.zeros(5, dtype=np.int64)
+        self.wall_impulse = np.zeros(4, dtype=np.float64)
+        self.dump_file = dump_file
+        self.dump_every = dump_every
+
+    def update(
+        self,
+        snapshot: Snapshot,
+        collided_pairs: np.ndarray,
+        wall_impulse: np.ndarray,
+        time_step: float,
+    ) -> None:
+        """
+        Add one simulation step to the statistics.
+        :param snapshot: Snapshot after the step
+        :param collided_pairs: np.ndarray of shape (c, 2), the ids of each pair of
+            balls that collided in the step
+        :param wall_impulse: np.ndarray of the momentum given to each wall in the step
+        :param time_step: float
+        :return: None
+        """
+        self.steps += 1
+        self.elapsed_time += time_step
+
+        speed = np.hypot(snapshot.velocity[:, 0], snapshot.velocity[:, 1])
+        momentum = snapshot.momentum()
+        self.kinetic_energy.add(snapshot.kinetic_energy())
+        self.momentum_x.add(float(momentum[0]))
+        self.momentum_y.add(float(momentum[1]))
+        self.speed.add_batch(speed)
+        bins = len(self.speed_histogram)
+        self.speed_histogram += np.bincount(
+            np.minimum((speed * (bins / self.max_speed)).astype(np.int64), bins - 1),
+            minlength=bins,
+        )
+
+        self.collisions += len(collided_pairs)
+        self.collisions_per_step.add(float(len(collided_pairs)))
+        ball_ids = np.sort(snapshot.ids)
+        ball_collisions = np.zeros(len(ball_ids), dtype=np.int64)
+        index, known = _lookup(self.ball_ids, ball_ids)
+        ball_collisions[known] = self.ball_collisions[index[known]]
+        self.ball_ids = ball_ids
+        self.ball_collisions = ball_collisions
+        if len(collided_pairs) > 0:
+            # every collision counts once for each of its two balls
+            collided_ids = collided_pairs.reshape(-1)
+            index, known = _lookup(ball_ids, collided_ids)
+            np.add.at(self.ball_collisions, index[known], 1)
+            collided = np.isin(snapshot.ids, collided_ids)
+            self.quadrant_collisions += np.bincount(
+                ArrayEngine.quadrants(snapshot.position[collided]), minlength=5
+            )
+        self.wall_impulse += wall_impulse
+
+        if self.dump_file is not None and self.dump_every > 0:
+            if self.steps % self.dump_every == 0:
+                self.dump(self.dump_file)
+
+    def wall_pressure(self) -> np.ndarray:
+        """
+        Average force per unit length on each wall since the start of the run.
+        :return: np.ndarray of shape (4,), in the order of Analytics.walls
+        """
+        if self.elapsed_time == 0:
+            return np.zeros(4, dtype=np.float64)
+        lengths = np.array(
+            [2 * self.height, 2 * self.width, 2 * self.height, 2 * self.width],
+            dtype=np.float64,
+        )
+        return self.wall_impulse / (lengths * self.elapsed_time)
+
+    def collision_rate(self) -> float:
+        """
+        Collisions per unit of simulated time since the start of the run.
+        :return: float
+        """
+        if self.elapsed_time == 0:
+            return 0.0
+        return self.collisions / self.elapsed_time
+
+    def summary(self) -> dict:
+        """
+        All statistics as a dictionary of plain Python values.
+        :return: dict
+        """
+        return {
+            "steps": self.steps,
+            "elapsed_time": self.elapsed_time,
+            "kinetic_energy": self.kinetic_energy.summary(),
+            "momentum_x": self.momentum_x.summary(),
+            "momentum_y": self.momentum_y.summary(),
+            "speed": self.speed.summary(),
+            "speed_histogram": {
+                "max_speed": self.max_speed,
+                "counts": self.speed_histogram.tolist(),
+            },
+            "collisions": self.collisions,
+            "collisions_per_step": self.collisions_per_step.summary(),
+            "collision_rate": self.collision_rate(),
+            "ball_collisions": {
+                ball_id: count
+                for ball_id, count in zip(
+                    self.ball_ids.tolist(), self.ball_collisions.tolist()
+                )
+                if count > 0
+            },
+            "quadrant_collisions": self.quadrant_collisions.tolist(),
+            "wall_pressure": dict(zip(Analytics.walls, self.wall_pressure().tolist())),
+        }
+
+    def dump(self, filename: str) -> None:
+        """
+        Write the summary to a JSON file.
+        :param filename: str
+        :return: None
+        """
+        if not isinstance(filename, str):
+            raise TypeError("Filename must be a string")
+
+        with open(filename, "w") as f:
+            json.dump(self.summary(), f, indent=2)
@@ -29,14 +29,17 @@ class BallObject:
         diameter: int,
         quadrant: int,
         color: str | None,
+        ball_id: int | None = None,
     ) -> None:
         """
         Create a new ball object with the specified position, velocity, diameter, quadrant, and color.
+        ball_id identifies the same ball across simulation steps.
         :param: position: tuple of floats
         :param: velocity: Vector2D
         :param: diameter: int
         :param: quadrant: int
         :param: color: str
+        :param: ball_id: int or None
         :return: None
         """
         if not all(isinstance(i, (float, int)) for i in position):
@@ -49,6 +52,8 @@ class BallObject:
             raise TypeError("Quadrant must be an integer")
         if color is not None and not isinstance(color, str):
             raise TypeError("Color must be a string")
+        if ball_id is not None and not isinstance(ball_id, int):
+            raise TypeError("Ball id must be an integer")
 
         self.position = position  # x cord and y cord
         self.velocity = velocity  # velocity vector
@@ -63,3 +68,4 @@ class BallObject:
         else:
             self.color = random.choice(BallObject.colors)  # color of ball
         self.mass = BallObject.materials[self.color] * self.surface_area  # mass of ball
+        self.ball_id = ball_id  # id of ball, kept across steps
@@ -0,0 +1,253 @@
+import numpy as np
+
+from ball import BallObject
+from engine import ArrayEngine, Snapshot
+
+
+class BatchEngine:
+    """
+    Advances many independent worlds at once, with the same rules as ArrayEngine.
+
+    The balls of every world are stacked into arrays of shape (worlds, n), where n
+    is the largest number of balls in a world and the remaining slots are padding,
+    so each phase of a step is a single NumPy operation over all worlds.
+    """
+
+    # largest number of pair distances computed at once by the partner search
+    max_pairs = 1 << 22
+
+    def __init__(
+        self,
+        worlds: list[dict[int, list[BallObject]]],
+        window_sizes: list[tuple[int, int]],
+        time_steps: list[float],
+        search_dists: list[float] | None = None,
+    ) -> None:
+        """
+        Create a new batch from the quadrant lists of every world.
+        search_dists default to half the larger side of each window.
+        :param worlds: list of dicts of lists of BallObjects (quadrants)
+        :param window_sizes: list of tuple[int, int]
+        :param time_steps: list of float
+        :param search_dists: list of float or None
+        :return: None
+        """
+        if not isinstance(worlds, list):
+            raise TypeError("worlds parameter must be a list.")
+        if not isinstance(window_sizes, list):
+            raise TypeError("window_sizes parameter must be a list.")
+        if not isinstance(time_steps, list):
+            raise TypeError("time_steps parameter must be a list.")
+        if search_dists is None:
+            search_dists = [max(size) / 2 for size in window_sizes]
+        if not len(worlds) == len(window_sizes) == len(time_steps) == len(search_dists):
+            raise ValueError("There must be one window size and time step per world.")
+
+        snapshots = [Snapshot.from_balls(world) for world in worlds]
+        count = len(worlds)
+        size = max([len(snapshot) for snapshot in snapshots], default=0)
+        self.ids = np.full((count, size), -1, dtype=np.int64)
+        self.position = np.zeros((count, size, 2), dtype=np.float64)
+        self.velocity = np.zeros((count, size, 2), dtype=np.float64)
+        self.radius = np.zeros((count, size), dtype=np.float64)
+        self.mass = np.zeros((count, size), dtype=np.float64)
+        self.alive = np.zeros((count, size), dtype=bool)
+        for world, snapshot in enumerate(snapshots):
+            balls = len(snapshot)
+            self.ids[world, :balls] = snapshot.ids
+            self.position[world, :balls] = snapshot.position
+            self.velocity[world, :balls] = snapshot.velocity
+            self.radius[world, :balls] = snapshot.radius
+            self.mass[world, :balls] = snapshot.mass
+            self.alive[world, :balls] = True
+
+        self.width = np.array([s[0] for s in window_sizes], dtype=np.float64)
+        self.height = np.array([s[1] for s in window_sizes], dtype=np.float64)
+        self.time_step = np.array(time_steps, dtype=np.float64)
+        self.search_dist = np.array(search_dists, dtype=np.float64)
+        # what happened in the last step of each world
+        self.collisions = np.zeros(count, dtype=np.int64)
+        self.wall_impulse = np.zeros((count, 4), dtype=np.float64)
+
+    def __closest_partners(self, quadrant: np.ndarray) -> np.ndarray:
+        """
+        Finds the closest ball in the same quadrant and world for every ball,
+        following Simulator.__closest_ball. Balls without a partner get -1.
+        :param quadrant: np.ndarray of shape (worlds, n)
+        :return: np.ndarray of shape (worlds * n,) of indices into the flattened batch
+        """
+        count, size = self.alive.shape
+        partner = np.full(count * size, -1, dtype=np.int64)
+        alive = np.flatnonzero(self.alive.reshape(-1))
+        if len(alive) == 0:
+            return partner
+
+        # group the balls by world and quadrant into buckets, keeping the order of
+        # the balls within each bucket
+        bucket = (alive // size) * 5 + quadrant.reshape(-1)[alive]
+        order = np.argsort(bucket, kind="stable")
+        alive = alive[order]
+        bucket = bucket[order]
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        lengths = np.diff(np.r_[starts, len(bucket)])
+
+        position = self.position.reshape(-1, 2)
+        radius = self.radius.reshape(-1)
+        # buckets of similar size are padded to a common width and searched together
+        by_length = np.argsort(-lengths, kind="stable")
+        first = 0
+        while first < len(by_length):
+            width = int(lengths[by_length[first]])
+            chunk = by_length[first : first + max(1, BatchEngine.max_pairs // width**2)]
+            # stop before buckets that would be more than half padding
+            chunk = chunk[: max(1, np.count_nonzero(2 * lengths[chunk] > width))]
+            first += len(chunk)
+            slot = np.arange(width)
+            group = np.where(
+                slot < lengths[chunk, None], starts[chunk, None] + slot, len(alive)
+            )
+            group = np.r_[alive, -1][group]
+            used = group >= 0
+            index = np.where(used, group, 0)
+            # rows are the searching ball, columns the candidate ball
+            x = position[index, 0]
+            y = position[index, 1]
+            r = radius[index]
+            # compared against squared distances from here on
+            limit = self.search_dist[index[:, 0] // size][:, None, None] ** 2
+            candidate = used[:, :, None] & used[:, None, :]
+            candidate &= ~np.eye(width, dtype=bool)
+            # a quadrant of two balls pairs them without any distance check
+            pair_only = (used.sum(axis=1) == 2)[:, None, None]
+
+            dx = x[:, None, :] - x[:, :, None]
+            dy = y[:, None, :] - y[:, :, None]
+            rough_dist = dx * dx + dy * dy
+            # squared distances to the four points on the edge of a candidate ball
+            # are rough_dist + r^2 +- 2r dx and +- 2r dy, so the nearest and the
+            # farthest point only depend on the larger of |dx| and |dy|
+            reach = 2 * r[:, None, :] * np.maximum(np.abs(dx), np.abs(dy))
+            score = rough_dist + r[:, None, :] ** 2
+            nearby = (rough_dist <= limit) & (score + reach <= limit)
+            nearby &= (dx != 0) | (dy != 0)
+            score -= reach
+
+            valid = candidate & (pair_only | nearby)
+            score = np.where(valid, np.where(pair_only, 0.0, score), np.inf)
+            closest = score.argmin(axis=2)
+            found = np.isfinite(np.take_along_axis(score, closest[:, :, None], axis=2))
+            found = found[:, :, 0] & used
+            partner[group[found]] = np.take_along_axis(group, closest, axis=1)[found]
+
+        return partner
+
+    def step(self) -> None:
+        """
+        Advances every world by its own time step.
+        :return: None
+        """
+        count, size = self.alive.shape
+        if size == 0:
+            return
+        quadrant = ArrayEngine.quadrants(self.position.reshape(-1, 2))
+        quadrant = quadrant.reshape(count, size)
+        partner = self.__closest_partners(quadrant)
+
+        # from here on every ball is addressed by its index in the flattened batch
+        world = np.repeat(np.arange(count), size)
+        position = self.position.reshape(-1, 2)
+        velocity = self.velocity.reshape(-1, 2)
+        radius = self.radius.reshape(-1)
+        mass = self.mass.reshape(-1)
+        searching = np.flatnonzero(partner >= 0)
+        found = partner[searching]
+        distance = np.sqrt(
+            (position[found, 0] - position[searching, 0]) ** 2
+            + (position[found, 1] - position[searching, 1]) ** 2
+        )
+        overlapping = distance < radius[searching] + radius[found]
+        source = searching[overlapping]
+        target = found[overlapping]
+
+        # reflect off the walls of each ball's own world
+        width = self.width[world]
+        height = self.height[world]
+        right = (position[:, 0] + radius >= width) & self.alive.reshape(-1)
+        left = ~right & (position[:, 0] - radius <= -width) & self.alive.reshape(-1)
+        top = (position[:, 1] + radius >= height) & self.alive.reshape(-1)
+        bottom = ~top & (position[:, 1] - radius <= -height) & self.alive.reshape(-1)
+        new_velocity = velocity.copy()
+        new_velocity[right | left, 0] *= -1
+        new_velocity[top | bottom, 1] *= -1
+
+        def collision_velocity(ball1: np.ndarray, ball2: np.ndarray) -> np.ndarray:
+            v1 = velocity[ball1]
+            v2 = velocity[ball2]
+            m1 = mass[ball1]
+            m2 = mass[ball2]
+            dx = (position[ball1, 0] - position[ball2, 0])[:, None]
+            return v1 - (
+                ((2 * m2 / (m1 + m2))[:, None] * (((v1 - v2) * dx) / dx**2)) * dx
+            )
+
+        new_velocity[target] = collision_velocity(target, source)
+        new_velocity[source] = collision_velocity(source, target)
+
+        collided = np.zeros(count * size, dtype=bool)
+        collided[source] = True
+        collided[target] = True
+        # momentum given to each wall, pointing out of the window
+        impulse = 2 * mass[:, None] * velocity
+        walls = np.stack(
+            [
+                np.where(right & ~collided, impulse[:, 0], 0),
+                np.where(top & ~collided, impulse[:, 1], 0),
+                np.where(left & ~collided, -impulse[:, 0], 0),
+                np.where(bottom & ~collided, -impulse[:, 1], 0),
+            ],
+            axis=1,
+        )
+        self.wall_impulse = walls.reshape(count, size, 4).sum(axis=1)
+        self.collisions = collided.reshape(count, size).sum(axis=1)
+
+        self.velocity = new_velocity.reshape(count, size, 2)
+        self.position = self.position + self.velocity * self.time_step[:, None, None]
+
+    def snapshot(self, world: int = 0) -> Snapshot:
+        """
+        The current state of one world.
+        :param world: int
+        :return: Snapshot
+        """
+        if not isinstance(world, int):
+            raise TypeError("world parameter must be an integer.")
+
+        alive = self.alive[world]
+        return Snapshot(
+            self.ids[world, alive],
+            self.position[world, alive],
+            self.velocity[world, alive],
+            self.radius[world, alive],
+            self.mass[world, alive],
+        )
+
+    def results(self) -> list[Snapshot]:
+        """
+        The current state of every world.
+        :return: list of Snapshot
+        """
+        return [self.snapshot(world) for world in range(len(self.alive))]
+
+    def kinetic_energy(self) -> np.ndarray:
+        """
+        Total kinetic energy of each world.
+        :return: np.ndarray of shape (worlds,)
+        """
+        return 0.5 * np.sum(self.mass * np.sum(self.velocity**2, axis=2), axis=1)
+
+    def momentum(self) -> np.ndarray:
+        """
+        Total momentum of each world.
+        :return: np.ndarray of shape (worlds, 2)
+        """
+        return np.sum(self.mass[:, :, None] * self.velocity, axis=1)
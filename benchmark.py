@@ -0,0 +1,96 @@
+import random
+import sys
+import time as Timer
+
+import numpy as np
+
+from engine import ArrayEngine
+
+
+def random_engine(
+    seed: int, num_of_balls: int, broadphase: str = "quadrant"
+) -> ArrayEngine:
+    """
+    Create an engine with randomly placed balls, at the same density whatever their
+    number. Unlike seeded_balls the balls may overlap, so large scenes are quick
+    to build.
+    :param seed: int
+    :param num_of_balls: int
+    :param broadphase: str
+    :return: ArrayEngine
+    """
+    if not isinstance(seed, int):
+        raise TypeError("seed parameter must be an integer.")
+    if not isinstance(num_of_balls, int):
+        raise TypeError("num_of_balls parameter must be an integer.")
+
+    side = int(20 * np.sqrt(num_of_balls)) + 20
+    state = random.getstate()
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    try:
+        engine = ArrayEngine({}, (side, side), 0.05, broadphase=broadphase)
+        engine.spawn(
+            rng.uniform(-side + 10, side - 10, (num_of_balls, 2)),
+            rng.uniform(-20, 20, (num_of_balls, 2)),
+            rng.integers(10, 16, num_of_balls),
+        )
+    finally:
+        random.setstate(state)
+    return engine
+
+
+def time_steps(engine, steps: int, cold: bool = False) -> float:
+    """
+    Average wall-clock time of a step.
+    :param engine: an engine with step()
+    :param steps: int
+    :param cold: bool, forget the sweep order before every step
+    :return: float, seconds
+    """
+    engine.step()
+    total = 0.0
+    for _ in range(steps):
+        if cold:
+            engine.sweep_order = np.zeros(0, dtype=np.int64)
+        begin_time = Timer.perf_counter()
+        engine.step()
+        total += Timer.perf_counter() - begin_time
+    return total / steps
+
+
+def compare_broadphases(
+    sizes: tuple[int, ...] = (100, 1000, 5000, 20000, 100000),
+    steps: int = 10,
+    seed: int = 0,
+    quadrant_limit: int = 5000,
+) -> list[tuple[int, str, float]]:
+    """
+    Time a step of every broadphase for scenes of the specified sizes.
+    The quadrant broadphase compares every pair of balls in a quadrant, so it is
+    only timed up to quadrant_limit balls.
+    :param sizes: tuple of int, numbers of balls
+    :param steps: int
+    :param seed: int
+    :param quadrant_limit: int
+    :return: list of tuples of number of balls, broadphase and seconds per step
+    """
+    results = []
+    for size in sizes:
+        if size <= quadrant_limit:
+            engine = random_engine(seed, size)
+            results.append((size, "quadrant", time_steps(engine, steps)))
+        engine = random_engine(seed, size, "sweep")
+        results.append((size, "sweep", time_steps(engine, steps)))
+        engine = random_engine(seed, size, "sweep")
+        seconds = time_steps(engine, steps, cold=True)
+        results.append((size, "sweep, sorted every step", seconds))
+    return results
+
+
+if __name__ == "__main__":
+    # Print the time per step of each broadphase, optionally for the sizes given
+    sizes = tuple(int(arg) for arg in sys.argv[1:]) or (100, 1000, 5000, 20000, 100000)
+    print(f"{'balls':>8}  {'broadphase':<26}{'ms per step':>12}")
+    for balls, broadphase, seconds in compare_broadphases(sizes):
+        print(f"{balls:>8}  {broadphase:<26}{1000 * seconds:>12.3f}")
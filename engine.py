@@ -0,0 +1,649 @@
+import random
+from math import inf, pi
+
+import numpy as np
+
+from ball import BallObject
+from vector import Vector2D
+
+
+class Snapshot:
+    """
+    A struct-of-arrays view of every ball at one point in the simulation.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        position: np.ndarray,
+        velocity: np.ndarray,
+        radius: np.ndarray,
+        mass: np.ndarray,
+    ) -> None:
+        """
+        Create a new snapshot from per-ball arrays that share the same ordering.
+        :param ids: np.ndarray of shape (n,)
+        :param position: np.ndarray of shape (n, 2)
+        :param velocity: np.ndarray of shape (n, 2)
+        :param radius: np.ndarray of shape (n,)
+        :param mass: np.ndarray of shape (n,)
+        :return: None
+        """
+        if not all(
+            isinstance(i, np.ndarray) for i in (ids, position, velocity, radius, mass)
+        ):
+            raise TypeError("Snapshot columns must be NumPy arrays.")
+        if not len(ids) == len(position) == len(velocity) == len(radius) == len(mass):
+            raise ValueError("Snapshot columns must all have the same length.")
+
+        self.ids = ids
+        self.position = position
+        self.velocity = velocity
+        self.radius = radius
+        self.mass = mass
+
+    def __len__(self) -> int:
+        """Number of balls in the snapshot."""
+        return len(self.ids)
+
+    @staticmethod
+    def from_balls(balls: dict[int, list[BallObject]]) -> "Snapshot":
+        """
+        Build a snapshot from the quadrant lists used by the Simulator.
+        :param balls: dict of lists of BallObjects (quadrants)
+        :return: Snapshot
+        """
+        if not isinstance(balls, dict):
+            raise TypeError("balls parameter must be a dictionary.")
+
+        flat = [ball for quadrant in balls for ball in balls[quadrant]]
+        return Snapshot(
+            np.array([b.ball_id for b in flat], dtype=np.int64),
+            np.array([b.position for b in flat], dtype=np.float64).reshape(-1, 2),
+            np.array(
+                [(b.velocity.x, b.velocity.y) for b in flat], dtype=np.float64
+            ).reshape(-1, 2),
+            np.array([b.radius for b in flat], dtype=np.float64),
+            np.array([b.mass for b in flat], dtype=np.float64),
+        )
+
+    def kinetic_energy(self) -> float:
+        """
+        Total kinetic energy of the balls.
+        :return: float
+        """
+        return float(0.5 * np.sum(self.mass * np.sum(self.velocity**2, axis=1)))
+
+    def momentum(self) -> np.ndarray:
+        """
+        Total momentum of the balls as an (x, y) array.
+        :return: np.ndarray of shape (2,)
+        """
+        return np.sum(self.mass[:, None] * self.velocity, axis=0)
+
+
+class ArrayEngine:
+    """
+    A vectorized engine that keeps every ball in NumPy arrays and advances them
+    with the same rules as Simulator.__move_balls.
+
+    Balls live in slots of arrays that double in size when full. Removed balls
+    leave their slot on a free list for the next spawned ball, and every ball
+    keeps its id for as long as it exists.
+
+    The broadphase finds which ball each ball collides with. "quadrant" compares
+    every pair of balls in a quadrant like the Simulator. "sweep" keeps the balls
+    sorted along one axis from step to step and finds the balls whose extents
+    overlap on it. Only the balls that overlap another are then compared against
+    the balls near enough to be the Simulator's closest ball, so both broadphases
+    collide the same balls.
+    """
+
+    def __init__(
+        self,
+        balls: dict[int, list[BallObject]],
+        window_size: tuple[int, int],
+        time_step: float,
+        search_dist: float | None = None,
+        broadphase: str = "quadrant",
+    ) -> None:
+        """
+        Create a new engine from the quadrant lists used by the Simulator.
+        search_dist defaults to the Simulator's value, half the larger window side.
+        :param balls: dict of lists of BallObjects (quadrants)
+        :param window_size: tuple[int, int]
+        :param time_step: float
+        :param search_dist: float or None
+        :param broadphase: str, "quadrant" or "sweep"
+        :return: None
+        """
+        if not isinstance(balls, dict):
+            raise TypeError("balls parameter must be a dictionary.")
+        if not isinstance(window_size, tuple):
+            raise TypeError("window_size parameter must be a tuple.")
+        if not isinstance(time_step, float):
+            raise TypeError("time_step parameter must be a float.")
+        if not isinstance(search_dist, (int, float, type(None))):
+            raise TypeError("search_dist parameter must be an int, float or None.")
+        if broadphase not in ("quadrant", "sweep"):
+            raise ValueError('broadphase parameter must be "quadrant" or "sweep".')
+
+        self.width = window_size[0]
+        self.height = window_size[1]
+        self.time_step = time_step
+        if search_dist is None:
+            search_dist = max(self.width, self.height) / 2
+        self.search_dist = search_dist
+        self.broadphase = broadphase
+        # slots sorted along the sweep axis in the last step
+        self.sweep_order = np.zeros(0, dtype=np.int64)
+        self.sweep_axis = -1
+
+        self.time = 0.0
+
+        # slots [0, size) have been used, the ones not alive are in free
+        self.capacity = 0
+        self.size = 0
+        self.free: list[int] = []
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.position = np.zeros((0, 2), dtype=np.float64)
+        self.velocity = np.zeros((0, 2), dtype=np.float64)
+        self.radius = np.zeros(0, dtype=np.float64)
+        self.mass = np.zeros(0, dtype=np.float64)
+        self.diameter = np.zeros(0, dtype=np.int64)
+        self.expires = np.zeros(0, dtype=np.float64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.colors: list[str | None] = []
+        # slot of every ball alive by id, ids are never reused
+        self.slots: dict[int, int] = {}
+        self.next_id = 0
+
+        flat = [ball for quadrant in balls for ball in balls[quadrant]]
+        snapshot = Snapshot.from_balls(balls)
+        self.next_id = int(snapshot.ids.max()) + 1 if len(flat) > 0 else 0
+        self.__insert(
+            snapshot.ids,
+            snapshot.position,
+            snapshot.velocity,
+            np.array([b.diameter for b in flat], dtype=np.int64),
+            snapshot.mass,
+            [b.color for b in flat],
+            np.full(len(flat), inf),
+        )
+        # what happened in the last step
+        self.collided_pairs = np.zeros((0, 2), dtype=np.int64)
+        self.wall_impulse = np.zeros(4, dtype=np.float64)
+
+    @property
+    def count(self) -> int:
+        """Number of balls alive."""
+        return self.size - len(self.free)
+
+    def live(self) -> np.ndarray:
+        """
+        Slots holding a ball.
+        :return: np.ndarray of slot indices
+        """
+        if len(self.free) == 0:
+            return np.arange(self.size)
+        return np.flatnonzero(self.alive[: self.size])
+
+    def __grow(self, capacity: int) -> None:
+        """
+        Reallocate every per-ball array with room for capacity balls.
+        :param capacity: int
+        :return: None
+        """
+
+        def grown(array: np.ndarray, fill: float | int | bool) -> np.ndarray:
+            new = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            new[: self.size] = array[: self.size]
+            return new
+
+        self.ids = grown(self.ids, -1)
+        self.position = grown(self.position, 0.0)
+        self.velocity = grown(self.velocity, 0.0)
+        self.radius = grown(self.radius, 0.0)
+        self.mass = grown(self.mass, 0.0)
+        self.diameter = grown(self.diameter, 0)
+        self.expires = grown(self.expires, inf)
+        self.alive = grown(self.alive, False)
+        self.colors += [None] * (capacity - len(self.colors))
+        self.capacity = capacity
+
+    def __insert(
+        self,
+        ids: np.ndarray,
+        position: np.ndarray,
+        velocity: np.ndarray,
+        diameter: np.ndarray,
+        mass: np.ndarray,
+        colors: list[str],
+        expires: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Put new balls into free slots, then at the end of the arrays, doubling
+        their capacity when they are full.
+        :return: np.ndarray of the slots used
+        """
+        count = len(ids)
+        reused = [self.free.pop() for _ in range(min(count, len(self.free)))]
+        appended = count - len(reused)
+        if self.size + appended > self.capacity:
+            self.__grow(max(self.size + appended, 2 * self.capacity, 16))
+        slots = np.array(reused + list(range(self.size, self.size + appended)))
+        slots = slots.astype(np.int64)
+        self.size += appended
+
+        self.ids[slots] = ids
+        self.position[slots] = position
+        self.velocity[slots] = velocity
+        self.diameter[slots] = diameter
+        self.radius[slots] = diameter / 2
+        self.mass[slots] = mass
+        self.expires[slots] = expires
+        self.alive[slots] = True
+        for slot, color in zip(slots.tolist(), colors):
+            self.colors[slot] = color
+
+        self.slots.update(zip(ids.tolist(), slots.tolist()))
+        return slots
+
+    def spawn(
+        self,
+        position: np.ndarray,
+        velocity: np.ndarray,
+        diameter: np.ndarray,
+        colors: list[str | None] | None = None,
+        lifetime: float | np.ndarray = inf,
+    ) -> np.ndarray:
+        """
+        Add new balls, each in amortized constant time.
+        Balls without a color get a random one, like BallObject.
+        :param position: np.ndarray of shape (m, 2)
+        :param velocity: np.ndarray of shape (m, 2)
+        :param diameter: np.ndarray of shape (m,) of ints
+        :param colors: list of str or None, or None
+        :param lifetime: float or np.ndarray of shape (m,), time before removal
+        :return: np.ndarray of the ids of the new balls
+        """
+        position = np.asarray(position, dtype=np.float64).reshape(-1, 2)
+        count = len(position)
+        velocity = np.asarray(velocity, dtype=np.float64).reshape(count, 2)
+        diameter = np.broadcast_to(np.asarray(diameter, dtype=np.int64), count)
+        if colors is None:
+            colors = [None] * count
+        if len(colors) != count:
+            raise ValueError("There must be one color per ball.")
+        colors = [
+            color if color is not None else random.choice(BallObject.colors)
+            for color in colors
+        ]
+        # same as BallObject.mass
+        mass = np.array([BallObject.materials[c] for c in colors], dtype=np.float64)
+        mass = mass * (pi * np.power(diameter / 2, 2))
+
+        ids = np.arange(self.next_id, self.next_id + count, dtype=np.int64)
+        self.next_id += count
+        expires = self.time + np.broadcast_to(np.asarray(lifetime, float), count)
+        self.__insert(ids, position, velocity, diameter, mass, colors, expires)
+        return ids
+
+    def remove(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Remove balls by id, each in constant time. Unknown ids are ignored.
+        :param ids: np.ndarray of ball ids
+        :return: np.ndarray of the ids removed
+        """
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        ids = np.array([i for i in ids.tolist() if i in self.slots], dtype=np.int64)
+        slots = np.array([self.slots.pop(i) for i in ids.tolist()], dtype=np.int64)
+        self.alive[slots] = False
+        self.ids[slots] = -1
+        self.velocity[slots] = 0.0
+        for slot in slots.tolist():
+            self.colors[slot] = None
+        self.free += slots.tolist()
+        return ids
+
+    def remove_in_rect(
+        self, lower: tuple[float, float], upper: tuple[float, float]
+    ) -> np.ndarray:
+        """
+        Remove every ball whose center is inside an axis-aligned rectangle.
+        :param lower: tuple[float, float], the bottom left corner
+        :param upper: tuple[float, float], the top right corner
+        :return: np.ndarray of the ids removed
+        """
+        live = self.live()
+        position = self.position[live]
+        inside = np.all((position >= lower) & (position <= upper), axis=1)
+        return self.remove(self.ids[live[inside]])
+
+    @staticmethod
+    def quadrants(position: np.ndarray) -> np.ndarray:
+        """
+        Find which quadrant each position is in, using the same bands as the Simulator.
+        :param position: np.ndarray of shape (n, 2)
+        :return: np.ndarray of shape (n,)
+        """
+        rounded = np.round(position, 2)
+        right = rounded[:, 0] > 0
+        top = rounded[:, 1] > 0
+        quadrant = np.where(right, np.where(top, 0, 3), np.where(top, 1, 2))
+        # balls close to either axis are kept in their own list
+        quadrant[(np.abs(rounded) <= 10).any(axis=1)] = 4
+        return quadrant
+
+    def __closest_partners(self, quadrant: np.ndarray) -> np.ndarray:
+        """
+        Finds the closest ball in the same quadrant for every ball, following
+        Simulator.__closest_ball. Balls without a partner get -1.
+        :param quadrant: np.ndarray of shape (n,)
+        :return: np.ndarray of shape (n,)
+        """
+        partner = np.full(len(quadrant), -1, dtype=np.int64)
+        for q in range(5):
+            members = np.flatnonzero(quadrant == q)
+            if len(members) < 2:
+                continue
+            if len(members) == 2:
+                partner[members[0]] = members[1]
+                partner[members[1]] = members[0]
+                continue
+
+            # rows are the searching ball, columns the candidate ball
+            x = self.position[members, 0]
+            y = self.position[members, 1]
+            r = self.radius[members]
+            rough_dist = np.sqrt(
+                (x[None, :] - x[:, None]) ** 2 + (y[None, :] - y[:, None]) ** 2
+            )
+            # the four points on the edge of each candidate ball
+            points = (
+                (x, y + r),
+                (x, y - r),
+                (x - r, y),
+                (x + r, y),
+            )
+            distances = np.stack(
+                [
+                    np.sqrt(
+                        (px[None, :] - x[:, None]) ** 2
+                        + (py[None, :] - y[:, None]) ** 2
+                    )
+                    for px, py in points
+                ]
+            )
+            same_position = (x[None, :] == x[:, None]) & (y[None, :] == y[:, None])
+            nearby = (
+                (rough_dist <= self.search_dist)
+                & (distances <= self.search_dist).all(axis=0)
+                & ~same_position
+            )
+            score = np.where(nearby, distances.min(axis=0), np.inf)
+            closest = score.argmin(axis=1)
+            found = np.isfinite(score[np.arange(len(members)), closest])
+            partner[members[found]] = members[closest[found]]
+
+        return partner
+
+    def __sweep_partners(self, quadrant: np.ndarray) -> np.ndarray:
+        """
+        Finds the closest ball in the same quadrant for every ball whose closest
+        ball, following Simulator.__closest_ball, overlaps it. Other balls get -1.
+        :param quadrant: np.ndarray of shape (n,)
+        :return: np.ndarray of shape (n,)
+        """
+        partner = np.full(len(quadrant), -1, dtype=np.int64)
+        live = np.flatnonzero(quadrant >= 0)
+        if len(live) < 2:
+            return partner
+        position = self.position[: self.size]
+        radius = self.radius[: self.size]
+
+        # sort along the axis the balls are most spread over, starting from the
+        # order of the last step so the sort only has to repair what moved
+        axis = int(np.argmax(position[live].var(axis=0)))
+        order = self.sweep_order
+        if (
+            axis != self.sweep_axis
+            or len(order) != len(live)
+            or not self.alive[order].all()
+        ):
+            order = live
+        lower = position[order, axis] - radius[order]
+        order = order[np.argsort(lower, kind="stable")]
+        self.sweep_order = order
+        self.sweep_axis = axis
+
+        # pair every ball with the balls after it whose extent starts before its
+        # own ends, so each pair is found once
+        lower = position[order, axis] - radius[order]
+        upper = position[order, axis] + radius[order]
+        counts = np.searchsorted(lower, upper, side="right") - np.arange(len(order)) - 1
+        first = np.repeat(np.arange(len(order)), counts)
+        offset = np.arange(len(first)) - np.repeat(np.cumsum(counts) - counts, counts)
+        ball1 = order[first]
+        ball2 = order[first + 1 + offset]
+        distance = np.sqrt(
+            (position[ball2, 0] - position[ball1, 0]) ** 2
+            + (position[ball2, 1] - position[ball1, 1]) ** 2
+        )
+        keep = (quadrant[ball1] == quadrant[ball2]) & (
+            distance < radius[ball1] + radius[ball2]
+        )
+        # only a ball overlapping another in its quadrant can collide
+        overlapping = np.unique(np.r_[ball1[keep], ball2[keep]])
+        if len(overlapping) == 0:
+            return partner
+
+        # The closest ball scores the distance to the nearest of four points on
+        # the edge of a candidate, so an overlapping ball scores less than
+        # r + 2 r_max, and a ball whose center is more than r + 3 r_max away
+        # scores more. Searching that far finds the closest ball whenever it
+        # overlaps.
+        largest = radius[live].max()
+        reach = radius[overlapping] + 3 * largest
+        center = position[overlapping, axis]
+        start = np.searchsorted(lower, center - reach - largest, side="left")
+        counts = np.searchsorted(lower, center + reach, side="right") - start
+        searching = np.repeat(overlapping, counts)
+        offset = np.arange(len(searching)) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        candidate = order[np.repeat(start, counts) + offset]
+        keep = (candidate != searching) & (quadrant[candidate] == quadrant[searching])
+        searching = searching[keep]
+        candidate = candidate[keep]
+        if len(searching) == 0:
+            return partner
+
+        # rank the candidates like __closest_partners
+        x = position[searching, 0]
+        y = position[searching, 1]
+        cx = position[candidate, 0]
+        cy = position[candidate, 1]
+        r = radius[candidate]
+        rough_dist = np.sqrt((cx - x) ** 2 + (cy - y) ** 2)
+        distances = np.stack(
+            [
+                np.sqrt((px - x) ** 2 + (py - y) ** 2)
+                for px, py in ((cx, cy + r), (cx, cy - r), (cx - r, cy), (cx + r, cy))
+            ]
+        )
+        nearby = (
+            (rough_dist <= self.search_dist)
+            & (distances <= self.search_dist).all(axis=0)
+            & ((cx != x) | (cy != y))
+        )
+        score = np.where(nearby, distances.min(axis=0), np.inf)
+        # a quadrant of two balls pairs them without any distance check
+        pair_only = np.bincount(quadrant[live], minlength=5)[quadrant[searching]] == 2
+        score[pair_only] = 0.0
+
+        # the best candidate of each ball, the lowest slot among equals, kept when
+        # it overlaps
+        best = np.lexsort((candidate, score, searching))
+        first = np.r_[True, searching[best][1:] != searching[best][:-1]]
+        best = best[first & np.isfinite(score[best])]
+        searching = searching[best]
+        candidate = candidate[best]
+        distance = np.sqrt(
+            (position[candidate, 0] - position[searching, 0]) ** 2
+            + (position[candidate, 1] - position[searching, 1]) ** 2
+        )
+        colliding = distance < radius[searching] + radius[candidate]
+        partner[searching[colliding]] = candidate[colliding]
+        return partner
+
+    def __collision_velocity(self, ball1: np.ndarray, ball2: np.ndarray) -> np.ndarray:
+        """
+        Determines the new velocity of each ball in ball1 after colliding with the
+        matching ball in ball2, in the same operation order as the Simulator.
+        :param ball1: np.ndarray of indices
+        :param ball2: np.ndarray of indices
+        :return: np.ndarray of shape (len(ball1), 2)
+        """
+        v1 = self.velocity[ball1]
+        v2 = self.velocity[ball2]
+        m1 = self.mass[ball1]
+        m2 = self.mass[ball2]
+        dx = (self.position[ball1, 0] - self.position[ball2, 0])[:, None]
+        return v1 - (((2 * m2 / (m1 + m2))[:, None] * (((v1 - v2) * dx) / dx**2)) * dx)
+
+    def __wall_velocity(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Determines the new velocity of every ball after colliding with the walls,
+        and which wall each ball hit, in the order right, top, left, bottom.
+        :return: tuple of np.ndarray of shape (n, 2) and np.ndarray of shape (n, 4)
+        """
+        x = self.position[: self.size, 0]
+        y = self.position[: self.size, 1]
+        radius = self.radius[: self.size]
+        alive = self.alive[: self.size]
+        right = (x + radius >= self.width) & alive
+        left = ~right & (x - radius <= -self.width) & alive
+        top = (y + radius >= self.height) & alive
+        bottom = ~top & (y - radius <= -self.height) & alive
+        new_velocity = self.velocity[: self.size].copy()
+        new_velocity[right | left, 0] *= -1
+        new_velocity[top | bottom, 1] *= -1
+        return new_velocity, np.stack([right, top, left, bottom], axis=1)
+
+    def step(self) -> None:
+        """
+        Advances every ball by one time step.
+        A ball whose closest partner overlaps it takes the collision response and
+        skips the wall check, like in the Simulator. Where the Simulator would emit a
+        ball twice because it is the partner of a ball it does not pick itself, this
+        engine keeps a single copy with the collision response.
+        Balls whose lifetime has run out are removed at the end of the step.
+        :return: None
+        """
+        quadrant = ArrayEngine.quadrants(self.position[: self.size])
+        # empty slots are in no quadrant
+        quadrant[~self.alive[: self.size]] = -1
+        if self.broadphase == "sweep":
+            partner = self.__sweep_partners(quadrant)
+        else:
+            partner = self.__closest_partners(quadrant)
+        searching = np.flatnonzero(partner >= 0)
+        found = partner[searching]
+        distance = np.sqrt(
+            (self.position[found, 0] - self.position[searching, 0]) ** 2
+            + (self.position[found, 1] - self.position[searching, 1]) ** 2
+        )
+        overlapping = distance < self.radius[searching] + self.radius[found]
+        source = searching[overlapping]
+        target = found[overlapping]
+
+        new_velocity, walls = self.__wall_velocity()
+        new_velocity[target] = self.__collision_velocity(target, source)
+        new_velocity[source] = self.__collision_velocity(source, target)
+
+        collided = np.union1d(source, target)
+        walls[collided] = False
+        # momentum given to each wall, pointing out of the window
+        impulse = 2 * self.mass[: self.size, None] * self.velocity[: self.size]
+        # a ball and its partner may each have picked the other
+        pairs = np.sort(np.stack([source, target], axis=1), axis=1)
+        self.collided_pairs = self.ids[np.unique(pairs, axis=0)]
+        self.wall_impulse = np.array(
+            [
+                impulse[walls[:, 0], 0].sum(),
+                impulse[walls[:, 1], 1].sum(),
+                -impulse[walls[:, 2], 0].sum(),
+                -impulse[walls[:, 3], 1].sum(),
+            ]
+        )
+
+        self.velocity[: self.size] = new_velocity
+        self.position[: self.size] += new_velocity * self.time_step
+        self.time += self.time_step
+
+        expired = self.alive[: self.size] & (self.expires[: self.size] <= self.time)
+        if expired.any():
+            self.remove(self.ids[: self.size][expired])
+
+    def nbytes(self) -> int:
+        """
+        Memory used by the per-ball arrays.
+        :return: int
+        """
+        return sum(
+            array.nbytes
+            for array in (
+                self.ids,
+                self.position,
+                self.velocity,
+                self.radius,
+                self.mass,
+                self.diameter,
+                self.expires,
+                self.alive,
+            )
+        )
+
+    def snapshot(self) -> Snapshot:
+        """
+        The current state of the engine. The arrays are views of the engine's own
+        unless balls have been removed, in which case the live balls are copied.
+        :return: Snapshot
+        """
+        if len(self.free) == 0:
+            live = slice(0, self.size)
+        else:
+            live = self.live()
+        return Snapshot(
+            self.ids[live],
+            self.position[live],
+            self.velocity[live],
+            self.radius[live],
+            self.mass[live],
+        )
+
+    def to_balls(self) -> dict[int, list[BallObject]]:
+        """
+        Convert the engine state back into the quadrant lists used by the Simulator.
+        :return: dict of lists of BallObjects (quadrants)
+        """
+        balls = {0: [], 1: [], 2: [], 3: [], 4: []}
+        live = self.live()
+        quadrant = ArrayEngine.quadrants(self.position[live]).tolist()
+        positions = self.position[live].tolist()
+        velocities = self.velocity[live].tolist()
+        for i, (slot, position, velocity) in enumerate(
+            zip(live.tolist(), positions, velocities)
+        ):
+            balls[quadrant[i]].append(
+                BallObject(
+                    (position[0], position[1]),
+                    Vector2D(velocity[0], velocity[1]),
+                    int(self.diameter[slot]),
+                    quadrant[i],
+                    self.colors[slot],
+                    int(self.ids[slot]),
+                )
+            )
+        return balls
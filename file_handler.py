@@ -1,6 +1,10 @@
 import pickle
+import zipfile
+
+import numpy as np
 
 from ball import BallObject
+from engine import Snapshot
 
 
 def save_to_file(balls: dict[int, list[BallObject]], filename: str) -> None:
@@ -35,3 +39,210 @@ def load_from_file(filename: str) -> dict[int, list[BallObject]]:
                 break
     print("Loaded balls from file successfully.")
     return balls
+
+
+# columns of a recording and whether they are stored once per chunk or per frame
+STATIC_COLUMNS = ("ids", "radius", "mass")
+FRAME_COLUMNS = ("position", "velocity")
+
+
+def _shuffled(bits: np.ndarray) -> np.ndarray:
+    """
+    Group the bytes of 64-bit values by significance, so the mostly constant high
+    bytes of small deltas end up next to each other and compress well.
+    :param bits: np.ndarray of int64
+    :return: np.ndarray of uint8 of shape (8, *bits.shape)
+    """
+    data = bits.view(np.uint8).reshape(*bits.shape, 8)
+    return np.ascontiguousarray(np.moveaxis(data, -1, 0))
+
+
+def _unshuffled(data: np.ndarray) -> np.ndarray:
+    """
+    Undo _shuffled.
+    :param data: np.ndarray of uint8 of shape (8, ...)
+    :return: np.ndarray of int64
+    """
+    return np.ascontiguousarray(np.moveaxis(data, 0, -1)).view(np.int64)[..., 0]
+
+
+class SnapshotRecorder:
+    """
+    Records snapshots into a compressed .npz archive, one typed array per column.
+
+    Frames are grouped into chunks that share the same balls. The ids, radii and
+    masses of a chunk are stored once, and the first frame of a chunk stores the
+    bit patterns of the positions and velocities while later frames only store
+    how those bit patterns differ from the first frame, so any frame can be read
+    from two arrays.
+    """
+
+    def __init__(self, filename: str, keyframe_every: int = 16) -> None:
+        """
+        Create a new archive. It can only be read once close() has been called.
+        A new chunk starts whenever the balls change and at least every
+        keyframe_every frames, as the differences grow with the distance travelled.
+        :param filename: str
+        :param keyframe_every: int
+        :return: None
+        """
+        if not isinstance(filename, str):
+            raise TypeError("filename parameter must be a string.")
+        if not isinstance(keyframe_every, int):
+            raise TypeError("keyframe_every parameter must be an integer.")
+        if keyframe_every < 1:
+            raise ValueError("keyframe_every parameter must be positive.")
+
+        self.filename = filename
+        self.keyframe_every = keyframe_every
+        # the fastest level, the differences compress well enough with it
+        self.archive = zipfile.ZipFile(
+            filename, "w", zipfile.ZIP_DEFLATED, compresslevel=1
+        )
+        self.steps: list[int] = []
+        # first frame of each chunk
+        self.chunk_start: list[int] = []
+        # ids of the last snapshot, and the order that sorts them by id
+        self.last_ids: np.ndarray | None = None
+        self.order = np.zeros(0, dtype=np.int64)
+        # bit patterns of the first frame of the chunk, per frame column
+        self.keyframe: dict[str, np.ndarray] = {}
+
+    def __write(self, name: str, array: np.ndarray) -> None:
+        """
+        Compress an array into the archive.
+        :param name: str
+        :param array: np.ndarray
+        :return: None
+        """
+        with self.archive.open(name + ".npy", "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, array, allow_pickle=False)
+
+    def add(self, snapshot: Snapshot, step: int) -> None:
+        """
+        Record a snapshot as the next frame.
+        :param snapshot: Snapshot
+        :param step: int
+        :return: None
+        """
+        if not isinstance(snapshot, Snapshot):
+            raise TypeError("snapshot parameter must be a Snapshot.")
+        if self.archive is None:
+            raise RuntimeError("Cannot add frames to a closed recording.")
+
+        frame = len(self.steps)
+        # balls are stored sorted by id, so the order of the snapshot does not matter
+        changed = self.last_ids is None
+        if changed or not np.array_equal(snapshot.ids, self.last_ids):
+            order = np.argsort(snapshot.ids, kind="stable")
+            changed = changed or not np.array_equal(
+                snapshot.ids[order], self.last_ids[self.order]
+            )
+            self.order = order
+            self.last_ids = snapshot.ids.copy()
+        if changed or frame - self.chunk_start[-1] >= self.keyframe_every:
+            chunk = len(self.chunk_start)
+            self.chunk_start.append(frame)
+            self.keyframe = {}
+            self.__write(f"ids_{chunk}", snapshot.ids[self.order])
+            self.__write(f"radius_{chunk}", snapshot.radius[self.order])
+            self.__write(f"mass_{chunk}", snapshot.mass[self.order])
+
+        for column in FRAME_COLUMNS:
+            values = np.asarray(getattr(snapshot, column), dtype=np.float64)
+            bits = np.ascontiguousarray(values[self.order]).view(np.int64)
+            if column not in self.keyframe:
+                self.keyframe[column] = bits.copy()
+                self.__write(f"{column}_{frame}", _shuffled(bits))
+            else:
+                delta = bits - self.keyframe[column]
+                self.__write(f"{column}_{frame}", _shuffled(delta))
+        self.steps.append(step)
+
+    def close(self) -> None:
+        """
+        Write the frame index and close the archive.
+        :return: None
+        """
+        if self.archive is None:
+            return
+        self.__write("steps", np.array(self.steps, dtype=np.int64))
+        self.__write("chunk_start", np.array(self.chunk_start, dtype=np.int64))
+        self.archive.close()
+        self.archive = None
+
+
+def load_frames(
+    filename: str,
+    columns: tuple[str, ...] = ("position",),
+    start: int = 0,
+    stop: int | None = None,
+) -> list[dict[str, np.ndarray]]:
+    """
+    Load some columns of a range of frames written by a SnapshotRecorder, reading
+    nothing else from the archive. start and stop select frames like a slice.
+    Frames are returned in chunks that share the same balls, each a dict with the
+    steps of its frames, the ids of its balls sorted, and the requested columns.
+    radius and mass have shape (n,), position and velocity (frames, n, 2).
+    :param filename: str
+    :param columns: tuple of column names
+    :param start: int
+    :param stop: int or None
+    :return: list of dicts of np.ndarray
+    """
+    if not isinstance(filename, str):
+        raise TypeError("filename parameter must be a string.")
+    unknown = set(columns) - set(STATIC_COLUMNS) - set(FRAME_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}.")
+
+    with np.load(filename) as archive:
+        steps = archive["steps"]
+        chunk_start = archive["chunk_start"]
+        start, stop, _ = slice(start, stop).indices(len(steps))
+        chunk_end = np.r_[chunk_start[1:], len(steps)]
+        chunks = []
+        for chunk, (first, end) in enumerate(zip(chunk_start, chunk_end)):
+            low, high = max(first, start), min(end, stop)
+            if low >= high:
+                continue
+            loaded = {"steps": steps[low:high], "ids": archive[f"ids_{chunk}"]}
+            for column in STATIC_COLUMNS[1:]:
+                if column in columns:
+                    loaded[column] = archive[f"{column}_{chunk}"]
+            for column in FRAME_COLUMNS:
+                if column not in columns:
+                    continue
+                values = np.empty((high - low, len(loaded["ids"]), 2))
+                keyframe = _unshuffled(archive[f"{column}_{first}"])
+                for frame in range(low, high):
+                    if frame == first:
+                        bits = keyframe
+                    else:
+                        bits = keyframe + _unshuffled(archive[f"{column}_{frame}"])
+                    values[frame - low] = bits.view(np.float64)
+                loaded[column] = values
+            chunks.append(loaded)
+    return chunks
+
+
+def load_snapshot(filename: str, frame: int = -1) -> Snapshot:
+    """
+    Load one frame written by a SnapshotRecorder, the last one by default.
+    :param filename: str
+    :param frame: int
+    :return: Snapshot
+    """
+    if not isinstance(frame, int):
+        raise TypeError("frame parameter must be an integer.")
+
+    with np.load(filename) as archive:
+        frame = range(len(archive["steps"]))[frame]
+    chunk = load_frames(filename, STATIC_COLUMNS + FRAME_COLUMNS, frame, frame + 1)[0]
+    return Snapshot(
+        chunk["ids"],
+        chunk["position"][0],
+        chunk["velocity"][0],
+        chunk["radius"],
+        chunk["mass"],
+    )
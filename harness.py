@@ -0,0 +1,473 @@
+import copy
+import random
+import sys
+from functools import partial
+from typing import Callable
+
+import numpy as np
+
+from ball import BallObject
+from engine import ArrayEngine, Snapshot
+from simulator import Simulator
+
+
+class ReferenceEngine:
+    """
+    Steps balls with the Simulator's own __move_balls, without opening a window.
+    """
+
+    def __init__(
+        self,
+        balls: dict[int, list[BallObject]],
+        window_size: tuple[int, int],
+        time_step: float,
+        search_dist: float | None = None,
+    ) -> None:
+        """
+        Create a new reference engine from the quadrant lists used by the Simulator.
+        :param balls: dict of lists of BallObjects (quadrants)
+        :param window_size: tuple[int, int]
+        :param time_step: float
+        :param search_dist: float or None
+        :return: None
+        """
+        if not isinstance(balls, dict):
+            raise TypeError("balls parameter must be a dictionary.")
+
+        self.simulator = Simulator(
+            window_size,
+            sum(len(balls[quadrant]) for quadrant in balls),
+            time_step=time_step,
+            headless=True,
+        )
+        self.simulator.balls = copy.deepcopy(balls)
+        if search_dist is not None:
+            self.simulator.search_dist = search_dist
+
+    def step(self) -> None:
+        """
+        Advances every ball by one time step.
+        :return: None
+        """
+        self.simulator.step()
+
+    def snapshot(self) -> Snapshot:
+        """
+        The current state of the engine.
+        :return: Snapshot
+        """
+        return Snapshot.from_balls(self.simulator.balls)
+
+    def drop(self, indices: np.ndarray) -> None:
+        """
+        Remove balls, for instance the extra copies of a ball emitted twice.
+        :param indices: np.ndarray of positions in the order of snapshot()
+        :return: None
+        """
+        dropped = set(np.asarray(indices).tolist())
+        index = 0
+        for quadrant in self.simulator.balls:
+            kept = []
+            for ball in self.simulator.balls[quadrant]:
+                if index not in dropped:
+                    kept.append(ball)
+                index += 1
+            self.simulator.balls[quadrant] = kept
+
+
+class Tolerances:
+    """
+    Tolerances used when comparing a candidate engine against the reference.
+    """
+
+    def __init__(
+        self,
+        position: float = 1e-6,
+        velocity: float = 1e-6,
+        energy: float = 1e-9,
+        momentum: float = 1e-9,
+        excused_frames: float = 0.5,
+        excused_balls: float = 0.05,
+    ) -> None:
+        """
+        Create a new set of tolerances.
+        position and velocity are absolute, energy and momentum are relative to the
+        total kinetic energy and to the sum of the momentum magnitudes.
+        excused_frames is the largest fraction of the frames compared, and
+        excused_balls the largest fraction of the balls in them, that may be
+        excused because of a defect of the reference, see HarnessReport.passed.
+        :param position: float
+        :param velocity: float
+        :param energy: float
+        :param momentum: float
+        :param excused_frames: float
+        :param excused_balls: float
+        :return: None
+        """
+        if not all(
+            isinstance(i, float)
+            for i in (
+                position,
+                velocity,
+                energy,
+                momentum,
+                excused_frames,
+                excused_balls,
+            )
+        ):
+            raise TypeError("Tolerances must be floats.")
+
+        self.position = position
+        self.velocity = velocity
+        self.energy = energy
+        self.momentum = momentum
+        self.excused_frames = excused_frames
+        self.excused_balls = excused_balls
+
+
+class HarnessReport:
+    """
+    The outcome of comparing a candidate engine against the reference.
+    """
+
+    def __init__(self, frames: int, tolerances: Tolerances | None = None) -> None:
+        """
+        Create an empty report for a run of the specified number of frames.
+        :param frames: int
+        :param tolerances: Tolerances or None
+        :return: None
+        """
+        self.frames = frames
+        self.tolerances = Tolerances() if tolerances is None else tolerances
+        self.frames_compared = 0
+        # number of balls summed over the frames compared
+        self.balls_compared = 0
+        self.first_divergent_frame: int | None = None
+        self.divergent_ids: list[int] = []
+        self.reason = ""
+        # (frame, engine name, quantity, relative error)
+        self.conservation_violations: list[tuple[int, str, str, float]] = []
+        # (frame, ids) of balls the reference emitted more than once
+        self.reference_duplicates: list[tuple[int, list[int]]] = []
+
+    def excused_violations(self) -> list[tuple[int, str]]:
+        """
+        The frames and quantities where the candidate did not conserve energy or
+        momentum, but no worse than the reference did in the same frame.
+        :return: list of tuples of frame and quantity
+        """
+        reference = {
+            (frame, quantity): error
+            for frame, name, quantity, error in self.conservation_violations
+            if name == "reference"
+        }
+        tolerance = {
+            "kinetic energy": self.tolerances.energy,
+            "momentum": self.tolerances.momentum,
+        }
+        return [
+            (frame, quantity)
+            for frame, name, quantity, error in self.conservation_violations
+            if name == "candidate"
+            and (frame, quantity) in reference
+            and error <= reference[frame, quantity] + tolerance[quantity]
+        ]
+
+    @property
+    def excused_frames(self) -> int:
+        """Number of frames where something was excused as a reference defect."""
+        frames = {frame for frame, _ in self.reference_duplicates}
+        frames |= {frame for frame, _ in self.excused_violations()}
+        return len(frames)
+
+    @property
+    def excused_balls(self) -> int:
+        """Number of balls, summed over the frames, the reference emitted twice."""
+        return sum(len(ids) for _, ids in self.reference_duplicates)
+
+    @property
+    def passed(self) -> bool:
+        """
+        True when the candidate matched the reference and conserved energy and
+        momentum wherever the reference did. Balls the reference emitted twice are a
+        defect of the reference and do not count, and neither do frames where a ball
+        collides with two others, which the Simulator's rules do not conserve, as
+        long as the candidate does no worse there. Such excuses could hide a
+        regression of the candidate, so it fails when they are more than the
+        tolerances allow.
+        """
+        excused = set(self.excused_violations())
+        return (
+            self.first_divergent_frame is None
+            and not any(
+                name == "candidate" and (frame, quantity) not in excused
+                for frame, name, quantity, _ in self.conservation_violations
+            )
+            and self.excused_frames
+            <= self.tolerances.excused_frames * self.frames_compared
+            and self.excused_balls
+            <= self.tolerances.excused_balls * self.balls_compared
+        )
+
+    def __str__(self) -> str:
+        """Human-readable summary of the report."""
+        lines = [f"Frames compared: {self.frames_compared}/{self.frames}"]
+        if self.first_divergent_frame is None:
+            lines.append("No divergence from the reference.")
+        else:
+            lines.append(
+                f"First divergent frame: {self.first_divergent_frame} ({self.reason})"
+            )
+            lines.append(f"Divergent balls: {self.divergent_ids}")
+        if self.excused_frames > 0:
+            lines.append(
+                f"Excused as defects of the reference: {self.excused_frames} frames "
+                f"and {self.excused_balls} balls"
+            )
+        for frame, ids in self.reference_duplicates:
+            lines.append(f"Frame {frame}: the reference emitted balls {ids} twice")
+        for frame, name, quantity, error in self.conservation_violations:
+            lines.append(
+                f"Frame {frame}: {name} does not conserve {quantity} "
+                f"(relative error {error:.3g})"
+            )
+        return "\n".join(lines)
+
+
+def seeded_balls(
+    seed: int, window_size: tuple[int, int], num_of_balls: int
+) -> dict[int, list[BallObject]]:
+    """
+    Generate the same initial balls as the Simulator would for the specified seed.
+    :param seed: int
+    :param window_size: tuple[int, int]
+    :param num_of_balls: int
+    :return: dict of lists of BallObjects (quadrants)
+    """
+    if not isinstance(seed, int):
+        raise TypeError("seed parameter must be an integer.")
+
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        simulator = Simulator(window_size, num_of_balls, headless=True)
+        simulator.populate()
+    finally:
+        random.setstate(state)
+    return simulator.balls
+
+
+def _aligned(snapshot: Snapshot) -> Snapshot:
+    """
+    Sort a snapshot by ball id.
+    :param snapshot: Snapshot
+    :return: Snapshot
+    """
+    order = np.argsort(snapshot.ids, kind="stable")
+    return Snapshot(
+        snapshot.ids[order],
+        snapshot.position[order],
+        snapshot.velocity[order],
+        snapshot.radius[order],
+        snapshot.mass[order],
+    )
+
+
+def _single_copies(
+    engine, snapshot: Snapshot, candidate: Snapshot
+) -> tuple[Snapshot, list[int]]:
+    """
+    Keep one copy of every ball the reference emitted more than once, the one
+    closest to the candidate's ball, and drop the others from the reference.
+    The Simulator emits a ball twice when it is the partner of a ball it does not
+    pick itself, and every copy is a valid outcome, so the candidate may keep any
+    of them like ArrayEngine keeps the one with its own collision response.
+    :param engine: reference engine, with drop() to remove copies
+    :param snapshot: Snapshot of the reference, in the engine's order
+    :param candidate: Snapshot of the candidate, sorted by id
+    :return: tuple of the reference Snapshot and the ids that had copies
+    """
+    ids, counts = np.unique(snapshot.ids, return_counts=True)
+    duplicated = ids[counts > 1]
+    if len(duplicated) == 0 or not hasattr(engine, "drop"):
+        return snapshot, []
+
+    dropped = []
+    for ball_id in duplicated.tolist():
+        copies = np.flatnonzero(snapshot.ids == ball_id)
+        match = np.searchsorted(candidate.ids, ball_id)
+        if match < len(candidate.ids) and candidate.ids[match] == ball_id:
+            position_error = snapshot.position[copies] - candidate.position[match]
+            velocity_error = snapshot.velocity[copies] - candidate.velocity[match]
+            error = np.abs(position_error).max(axis=1) + np.abs(velocity_error).max(
+                axis=1
+            )
+            keep = copies[np.argmin(error)]
+        else:
+            keep = copies[0]
+        dropped.extend(copies[copies != keep].tolist())
+    engine.drop(np.array(dropped, dtype=np.int64))
+    return engine.snapshot(), duplicated.tolist()
+
+
+def _conservation_errors(
+    before: Snapshot, after: Snapshot, window_size: tuple[int, int]
+) -> tuple[float, float]:
+    """
+    Relative change in kinetic energy and in momentum over one frame. Momentum
+    given to the balls by wall reflections is not counted as a change.
+    Both snapshots must be sorted by id and contain the same balls.
+    :param before: Snapshot
+    :param after: Snapshot
+    :param window_size: tuple[int, int]
+    :return: tuple[float, float]
+    """
+    energy = before.kinetic_energy()
+    energy_error = abs(after.kinetic_energy() - energy) / max(energy, 1e-300)
+
+    # a wall reflection is an exact sign flip of a ball touching that wall
+    limit = np.array(window_size, dtype=np.float64)
+    radius = before.radius[:, None]
+    touching = (before.position + radius >= limit) | (
+        before.position - radius <= -limit
+    )
+    reflected = touching & (after.velocity == -before.velocity)
+    impulse = before.mass[:, None] * (after.velocity - before.velocity)
+    wall_impulse = np.sum(np.where(reflected, impulse, 0), axis=0)
+    change = after.momentum() - before.momentum() - wall_impulse
+    scale = np.sum(before.mass * np.hypot(before.velocity[:, 0], before.velocity[:, 1]))
+    momentum_error = float(np.hypot(change[0], change[1]) / max(scale, 1e-300))
+    return energy_error, momentum_error
+
+
+def compare_engines(
+    candidate: Callable,
+    frames: int = 200,
+    seed: int = 0,
+    window_size: tuple[int, int] = (500, 500),
+    num_of_balls: int = 50,
+    time_step: float = 0.01,
+    tolerances: Tolerances | None = None,
+    reference: Callable = ReferenceEngine,
+) -> HarnessReport:
+    """
+    Run the reference and the candidate engine from the same seeded balls and
+    compare them frame by frame, stopping at the first divergent frame.
+    Engines are created as engine(balls, window_size, time_step) and must provide
+    step() and snapshot().
+    :param candidate: callable returning an engine
+    :param frames: int
+    :param seed: int
+    :param window_size: tuple[int, int]
+    :param num_of_balls: int
+    :param time_step: float
+    :param tolerances: Tolerances or None
+    :param reference: callable returning an engine
+    :return: HarnessReport
+    """
+    if not isinstance(frames, int):
+        raise TypeError("frames parameter must be an integer.")
+    if tolerances is None:
+        tolerances = Tolerances()
+
+    balls = seeded_balls(seed, window_size, num_of_balls)
+    engines = {
+        "reference": reference(copy.deepcopy(balls), window_size, time_step),
+        "candidate": candidate(copy.deepcopy(balls), window_size, time_step),
+    }
+    previous = {
+        name: _aligned(engine.snapshot()) for name, engine in engines.items()
+    }
+    report = HarnessReport(frames, tolerances)
+
+    for frame in range(1, frames + 1):
+        current = {}
+        for name, engine in engines.items():
+            engine.step()
+            current[name] = _aligned(engine.snapshot())
+        reference_snapshot, duplicated = _single_copies(
+            engines["reference"], engines["reference"].snapshot(), current["candidate"]
+        )
+        if len(duplicated) > 0:
+            report.reference_duplicates.append((frame, duplicated))
+            current["reference"] = _aligned(reference_snapshot)
+        expected = current["reference"]
+        actual = current["candidate"]
+
+        ids = expected.ids
+        if len(ids) > 1 and (ids[1:] == ids[:-1]).any():
+            report.first_divergent_frame = frame
+            report.divergent_ids = sorted(set(ids[1:][ids[1:] == ids[:-1]].tolist()))
+            report.reason = "the reference emitted some balls twice"
+            break
+
+        if not np.array_equal(expected.ids, actual.ids):
+            report.first_divergent_frame = frame
+            report.divergent_ids = sorted(
+                set(expected.ids.tolist()) ^ set(actual.ids.tolist())
+            )
+            report.reason = "the engines hold different balls"
+            break
+
+        position_error = np.abs(actual.position - expected.position).max(axis=1)
+        velocity_error = np.abs(actual.velocity - expected.velocity).max(axis=1)
+        divergent = (position_error > tolerances.position) | (
+            velocity_error > tolerances.velocity
+        )
+        if divergent.any():
+            report.first_divergent_frame = frame
+            report.divergent_ids = expected.ids[divergent].tolist()
+            report.reason = "positions or velocities differ"
+            break
+
+        for name in engines:
+            energy_error, momentum_error = _conservation_errors(
+                previous[name], current[name], window_size
+            )
+            if energy_error > tolerances.energy:
+                report.conservation_violations.append(
+                    (frame, name, "kinetic energy", energy_error)
+                )
+            if momentum_error > tolerances.momentum:
+                report.conservation_violations.append(
+                    (frame, name, "momentum", momentum_error)
+                )
+
+        previous = current
+        report.frames_compared = frame
+        report.balls_compared += len(ids)
+
+    return report
+
+
+if __name__ == "__main__":
+    # Check the vectorized engine with each broadphase against the reference over a
+    # few seeded scenes, sparse ones and dense ones full of collisions
+    failed = False
+    for broadphase in ("quadrant", "sweep"):
+        for scene_seed in range(5):
+            for window_size, num_of_balls in (((500, 500), 50), ((80, 80), 30)):
+                result = compare_engines(
+                    partial(ArrayEngine, broadphase=broadphase),
+                    seed=scene_seed,
+                    window_size=window_size,
+                    num_of_balls=num_of_balls,
+                )
+                print(
+                    f"{broadphase} broadphase, seed {scene_seed}, "
+                    f"{num_of_balls} balls in {window_size}:\n{result}\n"
+                )
+                failed = failed or not result.passed
+    # both broadphases must collide the same balls, even in crowded scenes
+    for scene_seed in range(5):
+        result = compare_engines(
+            partial(ArrayEngine, broadphase="sweep"),
+            frames=300,
+            seed=scene_seed,
+            window_size=(80, 80),
+            num_of_balls=40,
+            reference=partial(ArrayEngine, broadphase="quadrant"),
+        )
+        print(f"sweep against quadrant broadphase, seed {scene_seed}:\n{result}\n")
+        failed = failed or not result.passed
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,166 @@
+import math
+import time as Timer
+
+
+class FramePacer:
+    """
+    Decides how many physics steps run between two rendered frames and how often the
+    HUD is redrawn, from the time each phase of the simulation loop actually takes.
+    """
+
+    def __init__(
+        self,
+        target_fps: float | None = None,
+        steps_per_second: float | None = None,
+        deadline: float | None = None,
+        hud_interval: float = 0.25,
+        max_steps_per_frame: int = 1000,
+        smoothing: float = 0.2,
+    ) -> None:
+        """
+        Create a new pacer.
+        With target_fps, frames are rendered at that rate and the rest of each frame is
+        spent on physics. With steps_per_second, physics advances at that rate and
+        frames are rendered as often as the remaining time allows. Only one of the two
+        can be set; with neither, one step runs per frame.
+        deadline is the number of wall-clock seconds after which the run ends.
+        :param target_fps: float or None
+        :param steps_per_second: float or None
+        :param deadline: float or None
+        :param hud_interval: float, shortest time between two HUD updates in seconds
+        :param max_steps_per_frame: int
+        :param smoothing: float, weight of the newest timing in the running averages
+        :return: None
+        """
+        if not isinstance(target_fps, (int, float, type(None))):
+            raise TypeError("target_fps parameter must be an int, float or None.")
+        if not isinstance(steps_per_second, (int, float, type(None))):
+            raise TypeError("steps_per_second parameter must be an int, float or None.")
+        if not isinstance(deadline, (int, float, type(None))):
+            raise TypeError("deadline parameter must be an int, float or None.")
+        if not isinstance(hud_interval, (int, float)):
+            raise TypeError("hud_interval parameter must be an int or float.")
+        if not isinstance(max_steps_per_frame, int):
+            raise TypeError("max_steps_per_frame parameter must be an integer.")
+        if not isinstance(smoothing, float):
+            raise TypeError("smoothing parameter must be a float.")
+        if target_fps is not None and steps_per_second is not None:
+            raise ValueError("Only one of target_fps and steps_per_second can be set.")
+        if any(t is not None and t <= 0 for t in (target_fps, steps_per_second)):
+            raise ValueError("Targets must be positive.")
+
+        self.target_fps = target_fps
+        self.steps_per_second = steps_per_second
+        self.deadline = deadline
+        self.hud_interval = hud_interval
+        self.max_steps_per_frame = max_steps_per_frame
+        self.smoothing = smoothing
+
+        self.steps_per_frame = 1
+        # running average of the seconds spent in each phase per frame
+        self.timings: dict[str, float] = {}
+        self.step_time = 0.0
+        self.frames = 0
+        self.steps = 0
+        self.started = Timer.perf_counter()
+        self.frame_started = self.started
+        self.last_hud = -math.inf
+        self.__frame_timings: dict[str, float] = {}
+        self.__frame_steps = 0
+        self.__frame_step_seconds = 0.0
+
+    def start(self) -> None:
+        """
+        Start the clock used by the deadline and the step rate.
+        :return: None
+        """
+        self.started = Timer.perf_counter()
+        self.frame_started = self.started
+
+    def expired(self) -> bool:
+        """
+        Whether the deadline has passed.
+        :return: bool
+        """
+        return (
+            self.deadline is not None
+            and Timer.perf_counter() - self.started >= self.deadline
+        )
+
+    def record(self, phase: str, seconds: float, steps: int = 0) -> None:
+        """
+        Add the time spent in a phase of the current frame. Time recorded with a
+        number of steps is what the steps cost, the rest of the frame is rendering.
+        :param phase: str
+        :param seconds: float
+        :param steps: int, number of physics steps run in that time
+        :return: None
+        """
+        self.__frame_timings[phase] = self.__frame_timings.get(phase, 0.0) + seconds
+        if steps > 0:
+            self.__frame_steps += steps
+            self.__frame_step_seconds += seconds
+            per_step = seconds / steps
+            if self.step_time == 0.0:
+                self.step_time = per_step
+            else:
+                self.step_time += self.smoothing * (per_step - self.step_time)
+
+    def hud_due(self) -> bool:
+        """
+        Whether the HUD should be redrawn this frame. The HUD is kept to about a
+        twentieth of the run time however slow it is to draw.
+        :return: bool
+        """
+        interval = max(self.hud_interval, 20 * self.timings.get("hud", 0.0))
+        now = Timer.perf_counter()
+        if now - self.last_hud < interval:
+            return False
+        self.last_hud = now
+        return True
+
+    def end_frame(self) -> None:
+        """
+        Update the timings with the frame that just ended, choose the number of steps
+        for the next frame, and wait if the frame was faster than its target.
+        :return: None
+        """
+        now = Timer.perf_counter()
+        frame_time = now - self.frame_started
+        self.frames += 1
+        self.steps += self.__frame_steps
+        for phase, seconds in self.__frame_timings.items():
+            average = self.timings.get(phase, seconds)
+            self.timings[phase] = average + self.smoothing * (seconds - average)
+        render = max(frame_time - self.__frame_step_seconds, 0.0)
+        average = self.timings.get("render", render)
+        self.timings["render"] = average + self.smoothing * (render - average)
+        self.__frame_timings = {}
+        self.__frame_steps = 0
+        self.__frame_step_seconds = 0.0
+
+        render = self.timings["render"]
+        wait = 0.0
+        if self.target_fps is not None:
+            budget = 1 / self.target_fps
+            steps = (budget - render) / max(self.step_time, 1e-9)
+            wait = budget - frame_time
+        elif self.steps_per_second is not None:
+            # steps needed to cover the time of a frame, plus whatever we are behind
+            rate = self.steps_per_second
+            behind = rate * (now - self.started) - self.steps
+            if rate * self.step_time < 1:
+                steps = rate * render / (1 - rate * self.step_time) + behind
+            else:
+                steps = self.max_steps_per_frame
+            if behind < 0:
+                wait = -behind / rate
+        else:
+            steps = 1
+        self.steps_per_frame = int(min(max(steps, 1), self.max_steps_per_frame))
+
+        if wait > 0:
+            if self.deadline is not None:
+                wait = min(wait, self.started + self.deadline - now)
+            Timer.sleep(max(wait, 0.0))
+        self.frame_started = Timer.perf_counter()
@@ -0,0 +1,110 @@
+import random
+from math import inf
+
+import numpy as np
+
+
+class Emitter:
+    """
+    Spawns balls at a steady rate at random positions inside a rectangle.
+    """
+
+    def __init__(
+        self,
+        lower: tuple[float, float],
+        upper: tuple[float, float],
+        rate: float,
+        speed: float = 20.0,
+        diameter: tuple[int, int] = (10, 15),
+        lifetime: float = inf,
+    ) -> None:
+        """
+        Create a new emitter.
+        rate is the number of balls per unit of simulated time. Each ball gets a random
+        velocity with components up to speed, and a random diameter in the given range.
+        :param lower: tuple[float, float], the bottom left corner
+        :param upper: tuple[float, float], the top right corner
+        :param rate: float
+        :param speed: float
+        :param diameter: tuple[int, int]
+        :param lifetime: float, time before each ball is removed
+        :return: None
+        """
+        if not isinstance(lower, tuple) or not isinstance(upper, tuple):
+            raise TypeError("lower and upper parameters must be tuples.")
+        if not isinstance(rate, (int, float)):
+            raise TypeError("rate parameter must be an int or float.")
+        if not isinstance(speed, (int, float)):
+            raise TypeError("speed parameter must be an int or float.")
+        if not isinstance(diameter, tuple):
+            raise TypeError("diameter parameter must be a tuple.")
+        if not isinstance(lifetime, (int, float)):
+            raise TypeError("lifetime parameter must be an int or float.")
+        if rate < 0:
+            raise ValueError("rate parameter must not be negative.")
+
+        self.lower = lower
+        self.upper = upper
+        self.rate = rate
+        self.speed = speed
+        self.diameter = diameter
+        self.lifetime = lifetime
+        # fraction of a ball carried over to the next step
+        self.pending = 0.0
+
+    def emit(
+        self, time_step: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The balls to spawn during one time step.
+        :param time_step: float
+        :return: tuple of positions, velocities and diameters
+        """
+        self.pending += self.rate * time_step
+        count = int(self.pending)
+        self.pending -= count
+
+        position = np.array(
+            [
+                (
+                    random.uniform(self.lower[0], self.upper[0]),
+                    random.uniform(self.lower[1], self.upper[1]),
+                )
+                for _ in range(count)
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        velocity = np.array(
+            [
+                (
+                    random.uniform(-self.speed, self.speed),
+                    random.uniform(-self.speed, self.speed),
+                )
+                for _ in range(count)
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        diameter = np.array(
+            [random.randint(self.diameter[0], self.diameter[1]) for _ in range(count)],
+            dtype=np.int64,
+        )
+        return position, velocity, diameter
+
+
+class Sink:
+    """
+    Removes every ball whose center enters a rectangle.
+    """
+
+    def __init__(self, lower: tuple[float, float], upper: tuple[float, float]) -> None:
+        """
+        Create a new sink.
+        :param lower: tuple[float, float], the bottom left corner
+        :param upper: tuple[float, float], the top right corner
+        :return: None
+        """
+        if not isinstance(lower, tuple) or not isinstance(upper, tuple):
+            raise TypeError("lower and upper parameters must be tuples.")
+
+        self.lower = lower
+        self.upper = upper
@@ -0,0 +1,181 @@
+import os
+import signal
+import sys
+import threading
+import time as Timer
+from types import CodeType
+from typing import Callable
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of the thread running the simulation from a background
+    thread, and counts the samples per range of steps and phase of the simulation
+    loop.
+
+    The counts are written in the collapsed stack format read by flame graph tools,
+    one line per stack with its frames separated by semicolons and followed by the
+    number of samples, and the first two frames are the step range and the phase.
+    """
+
+    def __init__(
+        self,
+        filename: str = "profile.folded",
+        interval: float = 0.005,
+        steps_per_range: int = 1000,
+        dump_every: float = 60.0,
+        toggle_signal: int | None = getattr(signal, "SIGUSR1", None),
+    ) -> None:
+        """
+        Create a new profiler. It does nothing until attach() is called.
+        The counts are written to filename every dump_every seconds and when the
+        profiler is closed, so long runs can be inspected while they go on.
+        Sending toggle_signal to the process pauses or resumes sampling.
+        :param filename: str
+        :param interval: float, seconds between two samples
+        :param steps_per_range: int
+        :param dump_every: float, seconds
+        :param toggle_signal: int or None
+        :return: None
+        """
+        if not isinstance(filename, str):
+            raise TypeError("filename parameter must be a string.")
+        if not isinstance(interval, float):
+            raise TypeError("interval parameter must be a float.")
+        if not isinstance(steps_per_range, int):
+            raise TypeError("steps_per_range parameter must be an integer.")
+        if not isinstance(dump_every, (int, float)):
+            raise TypeError("dump_every parameter must be an int or float.")
+        if not isinstance(toggle_signal, (int, type(None))):
+            raise TypeError("toggle_signal parameter must be an integer or None.")
+        if interval <= 0 or steps_per_range < 1:
+            raise ValueError("interval and steps_per_range must be positive.")
+
+        self.filename = filename
+        self.interval = interval
+        self.steps_per_range = steps_per_range
+        self.dump_every = dump_every
+        self.toggle_signal = toggle_signal
+        self.enabled = True
+        self.samples = 0
+        # samples per step range, phase and stack of code objects, outermost first
+        self.counts: dict[tuple[int, str, tuple[CodeType, ...]], int] = {}
+        self.context: Callable[[], tuple[int, str]] = lambda: (0, "")
+        self.target: int | None = None
+        self.thread: threading.Thread | None = None
+        self.previous_handler = None
+        self.__stop = threading.Event()
+
+    def attach(self, context: Callable[[], tuple[int, str]]) -> None:
+        """
+        Start sampling the calling thread.
+        :param context: callable returning the current step and phase
+        :return: None
+        """
+        if not callable(context):
+            raise TypeError("context parameter must be callable.")
+        if self.thread is not None:
+            raise RuntimeError("The profiler is already attached.")
+
+        self.context = context
+        self.target = threading.get_ident()
+        # signal handlers can only be installed from the main thread
+        if (
+            self.toggle_signal is not None
+            and threading.current_thread() is threading.main_thread()
+        ):
+            self.previous_handler = signal.signal(
+                self.toggle_signal, lambda signum, frame: self.toggle()
+            )
+        self.__stop.clear()
+        self.thread = threading.Thread(
+            target=self.__run, name="SamplingProfiler", daemon=True
+        )
+        self.thread.start()
+
+    def toggle(self) -> None:
+        """
+        Pause sampling if it is running, resume it otherwise.
+        :return: None
+        """
+        self.enabled = not self.enabled
+
+    def __run(self) -> None:
+        """
+        Take samples until the profiler is closed.
+        :return: None
+        """
+        last_dump = Timer.perf_counter()
+        while not self.__stop.wait(self.interval):
+            if self.enabled:
+                self.__sample()
+            now = Timer.perf_counter()
+            if self.dump_every > 0 and now - last_dump >= self.dump_every:
+                self.dump()
+                last_dump = now
+
+    def __sample(self) -> None:
+        """
+        Count the current stack of the target thread.
+        :return: None
+        """
+        frame = sys._current_frames().get(self.target)
+        if frame is None:
+            return
+        step, phase = self.context()
+        stack = []
+        while frame is not None:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        key = (step // self.steps_per_range, phase, tuple(reversed(stack)))
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.samples += 1
+
+    def collapsed(self) -> list[str]:
+        """
+        The samples in the collapsed stack format, one line per stack.
+        :return: list of str
+        """
+        lines = []
+        for (step_range, phase, stack), count in sorted(
+            self.counts.copy().items(), key=lambda item: (item[0][0], item[0][1])
+        ):
+            first = step_range * self.steps_per_range
+            frames = [f"steps {first}-{first + self.steps_per_range - 1}", phase]
+            frames += [
+                f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                f":{code.co_firstlineno})"
+                for code in stack
+            ]
+            lines.append(";".join(f.replace(";", ":") for f in frames) + f" {count}")
+        return lines
+
+    def dump(self, filename: str | None = None) -> None:
+        """
+        Write the samples to a file, by default the profiler's own.
+        :param filename: str or None
+        :return: None
+        """
+        if not isinstance(filename, (str, type(None))):
+            raise TypeError("filename parameter must be a string or None.")
+
+        # write to a temporary file first so readers never see a partial profile
+        filename = self.filename if filename is None else filename
+        with open(filename + ".tmp", "w") as f:
+            f.writelines(line + "\n" for line in self.collapsed())
+        os.replace(filename + ".tmp", filename)
+
+    def close(self) -> None:
+        """
+        Stop sampling, restore the signal handler and write the samples.
+        :return: None
+        """
+        if self.thread is None:
+            return
+        self.__stop.set()
+        self.thread.join()
+        self.thread = None
+        if self.previous_handler is not None:
+            signal.signal(self.toggle_signal, self.previous_handler)
+            self.previous_handler = None
+        self.dump()
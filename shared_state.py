@@ -0,0 +1,302 @@
+import os
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from engine import Snapshot
+
+# header slots, all int64
+SEQUENCE = 0
+CAPACITY = 1
+COUNT = 2  # one per buffer, at COUNT and COUNT + 1
+STEP = 4  # one per buffer, at STEP and STEP + 1
+HEADER_SIZE = 8
+# bytes per ball in one buffer: id, position, velocity, radius and mass
+BALL_SIZE = 8 * (1 + 2 + 2 + 1 + 1)
+
+
+def _segment_name(name: str, generation: int) -> str:
+    """
+    Name of the segment holding the ball arrays of one generation.
+    :param name: str
+    :param generation: int
+    :return: str
+    """
+    return f"{name}-{generation}"
+
+
+def _tracker_pipe() -> int:
+    """
+    Identifies the resource tracker of this process by the inode of the pipe used to
+    talk to it, which is the same in every process sharing the tracker.
+    :return: int
+    """
+    return os.fstat(resource_tracker.getfd()).st_ino
+
+
+def _views(buffer: memoryview, capacity: int, slot: int) -> tuple[np.ndarray, ...]:
+    """
+    Map the arrays of one of the two buffers in a segment.
+    :param buffer: memoryview of the segment
+    :param capacity: int
+    :param slot: int, 0 or 1
+    :return: tuple of ids, position, velocity, radius and mass arrays
+    """
+    offset = 8 * HEADER_SIZE + slot * capacity * BALL_SIZE
+    ids = np.ndarray((capacity,), np.int64, buffer, offset)
+    offset += ids.nbytes
+    position = np.ndarray((capacity, 2), np.float64, buffer, offset)
+    offset += position.nbytes
+    velocity = np.ndarray((capacity, 2), np.float64, buffer, offset)
+    offset += velocity.nbytes
+    radius = np.ndarray((capacity,), np.float64, buffer, offset)
+    offset += radius.nbytes
+    mass = np.ndarray((capacity,), np.float64, buffer, offset)
+    return ids, position, velocity, radius, mass
+
+
+class StatePublisher:
+    """
+    Publishes the ball arrays of a simulation into a shared memory segment.
+
+    The segment holds two buffers. Frame f is written into buffer f % 2 while
+    readers keep using buffer (f - 1) % 2, and a sequence counter that is odd
+    while a frame is being written tells readers which frame is complete.
+
+    The segment named after the publisher only holds a generation number and
+    which resource tracker removes the segments if the publisher dies. The ball
+    arrays are in a segment per generation, and when a frame no longer fits
+    a segment twice as large is created and the generation number increased, so
+    readers know to attach to it.
+    """
+
+    def __init__(self, name: str, capacity: int) -> None:
+        """
+        Create new shared memory segments able to hold capacity balls at first.
+        :param name: str
+        :param capacity: int
+        :return: None
+        """
+        if not isinstance(name, str):
+            raise TypeError("name parameter must be a string.")
+        if not isinstance(capacity, int):
+            raise TypeError("capacity parameter must be an integer.")
+        if capacity < 1:
+            raise ValueError("capacity parameter must be positive.")
+
+        self.name = name
+        self.control = shared_memory.SharedMemory(name, create=True, size=16)
+        self.generation = np.ndarray((1,), np.int64, self.control.buf)
+        self.generation[0] = 0
+        np.ndarray((1,), np.int64, self.control.buf, 8)[0] = _tracker_pipe()
+        self.__allocate(capacity, 0, 0)
+
+    def __allocate(self, capacity: int, generation: int, sequence: int) -> None:
+        """
+        Create the segment of a generation and write into it from now on.
+        :param capacity: int
+        :param generation: int
+        :param sequence: int, where the sequence counter of the new segment starts
+        :return: None
+        """
+        self.memory = shared_memory.SharedMemory(
+            _segment_name(self.name, generation),
+            create=True,
+            size=8 * HEADER_SIZE + 2 * capacity * BALL_SIZE,
+        )
+        self.capacity = capacity
+        self.header = np.ndarray((HEADER_SIZE,), np.int64, self.memory.buf)
+        self.header[:] = 0
+        self.header[SEQUENCE] = sequence
+        self.header[CAPACITY] = capacity
+        self.buffers = (
+            _views(self.memory.buf, capacity, 0),
+            _views(self.memory.buf, capacity, 1),
+        )
+
+    def publish(self, snapshot: Snapshot, step: int) -> None:
+        """
+        Write a snapshot as the next frame.
+        :param snapshot: Snapshot
+        :param step: int
+        :return: None
+        """
+        if not isinstance(snapshot, Snapshot):
+            raise TypeError("snapshot parameter must be a Snapshot.")
+        count = len(snapshot)
+        old = None
+        if count > self.capacity:
+            old = self.memory
+            sequence = int(self.header[SEQUENCE])
+            del self.header, self.buffers
+            self.__allocate(
+                max(count, 2 * self.capacity), int(self.generation[0]) + 1, sequence
+            )
+
+        frame = int(self.header[SEQUENCE]) // 2 + 1
+        slot = frame % 2
+        self.header[SEQUENCE] += 1
+        ids, position, velocity, radius, mass = self.buffers[slot]
+        ids[:count] = snapshot.ids
+        position[:count] = snapshot.position
+        velocity[:count] = snapshot.velocity
+        radius[:count] = snapshot.radius
+        mass[:count] = snapshot.mass
+        self.header[COUNT + slot] = count
+        self.header[STEP + slot] = step
+        self.header[SEQUENCE] += 1
+        if old is not None:
+            # readers only move to the new segment once it holds a frame, and the
+            # ones still mapping the old segment keep their arrays until they do
+            self.generation[0] += 1
+            old.close()
+            old.unlink()
+
+    def close(self) -> None:
+        """
+        Close and remove the segments.
+        :return: None
+        """
+        del self.header, self.buffers, self.generation
+        self.memory.close()
+        self.memory.unlink()
+        self.control.close()
+        self.control.unlink()
+
+
+class StateReader:
+    """
+    Maps the ball arrays published by a StatePublisher in another process,
+    following the publisher to larger segments as the number of balls grows.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Attach to existing shared memory segments.
+        :param name: str
+        :return: None
+        """
+        if not isinstance(name, str):
+            raise TypeError("name parameter must be a string.")
+
+        self.name = name
+        self.control = shared_memory.SharedMemory(name)
+        # the publisher owns the segments, so they must not be removed when we exit.
+        # A process started by multiprocessing shares the publisher's resource
+        # tracker, where unregistering would drop the publisher's own registration.
+        tracker = int(np.ndarray((1,), np.int64, self.control.buf, 8)[0])
+        self.shared_tracker = tracker == _tracker_pipe()
+        if not self.shared_tracker:
+            resource_tracker.unregister(self.control._name, "shared_memory")
+        self.generation = np.ndarray((1,), np.int64, self.control.buf)
+        self.attached = -1
+        self.memory: shared_memory.SharedMemory | None = None
+        # segments of older generations, closed once nothing uses their arrays
+        self.retired: list[shared_memory.SharedMemory] = []
+        self.__attach()
+
+    def __attach(self) -> None:
+        """
+        Map the segment of the current generation, if not already mapped.
+        :return: None
+        """
+        while self.attached != int(self.generation[0]):
+            generation = int(self.generation[0])
+            try:
+                memory = shared_memory.SharedMemory(
+                    _segment_name(self.name, generation)
+                )
+            except FileNotFoundError:
+                # the publisher moved on again before we could attach
+                continue
+            if not self.shared_tracker:
+                resource_tracker.unregister(memory._name, "shared_memory")
+            if self.memory is not None:
+                del self.header, self.buffers
+                self.retired.append(self.memory)
+            self.memory = memory
+            self.attached = generation
+            self.header = np.ndarray((HEADER_SIZE,), np.int64, memory.buf)
+            self.capacity = int(self.header[CAPACITY])
+            self.buffers = (
+                _views(memory.buf, self.capacity, 0),
+                _views(memory.buf, self.capacity, 1),
+            )
+        self.__close_retired()
+
+    def __close_retired(self) -> None:
+        """
+        Close the segments of older generations whose arrays are no longer used.
+        :return: None
+        """
+        still_used = []
+        for memory in self.retired:
+            try:
+                memory.close()
+            except BufferError:
+                still_used.append(memory)
+        self.retired = still_used
+
+    def latest(self) -> tuple[int, int, Snapshot | None]:
+        """
+        The last complete frame, without copying. The arrays stay consistent until
+        the publisher starts writing frame + 2, which valid() reports.
+        :return: tuple of frame, step and Snapshot (None before the first frame)
+        """
+        if self.attached != int(self.generation[0]):
+            self.__attach()
+        frame = int(self.header[SEQUENCE]) // 2
+        if frame == 0:
+            return 0, 0, None
+        slot = frame % 2
+        count = int(self.header[COUNT + slot])
+        step = int(self.header[STEP + slot])
+        ids, position, velocity, radius, mass = self.buffers[slot]
+        snapshot = Snapshot(
+            ids[:count],
+            position[:count],
+            velocity[:count],
+            radius[:count],
+            mass[:count],
+        )
+        # the count and step may belong to a newer frame if we were too slow
+        if not self.valid(frame):
+            return self.latest()
+        return frame, step, snapshot
+
+    def valid(self, frame: int) -> bool:
+        """
+        Whether the arrays returned by latest() for frame have not been overwritten.
+        :param frame: int
+        :return: bool
+        """
+        return int(self.header[SEQUENCE]) < 2 * frame + 3
+
+    def read(self) -> tuple[int, int, Snapshot | None]:
+        """
+        A copy of the last complete frame, retrying if it is overwritten while copying.
+        :return: tuple of frame, step and Snapshot (None before the first frame)
+        """
+        while True:
+            frame, step, snapshot = self.latest()
+            if snapshot is None:
+                return frame, step, None
+            copied = Snapshot(
+                snapshot.ids.copy(),
+                snapshot.position.copy(),
+                snapshot.velocity.copy(),
+                snapshot.radius.copy(),
+                snapshot.mass.copy(),
+            )
+            if self.valid(frame):
+                return frame, step, copied
+
+    def close(self) -> None:
+        """
+        Detach from the segments.
+        :return: None
+        """
+        del self.header, self.buffers, self.generation
+        self.memory.close()
+        self.control.close()
+        self.__close_retired()
@@ -1,12 +1,22 @@
 import math
-import os
 import random
 import sys
 import time as Timer
+from math import inf
 
+import numpy as np
+
+from analytics import Analytics
 from ball import BallObject
+from engine import ArrayEngine, Snapshot
+from file_handler import SnapshotRecorder
 from file_handler import load_from_file as load
 from file_handler import save_to_file as save
+from pacing import FramePacer
+from population import Emitter, Sink
+from profiler import SamplingProfiler
+from shared_state import StatePublisher
+from spatial import KDTree
 from vector import Vector2D
 from view import Window
 
@@ -216,16 +226,45 @@ class Simulator:
         drawing_accuracy: int = 0,
         length_of_simulation: float | None = None,
         debug: bool = False,
+        headless: bool = False,
+        engine: str = "reference",
+        broadphase: str = "quadrant",
+        analytics: Analytics | None = None,
+        shared_memory: str | None = None,
+        pacer: FramePacer | None = None,
+        recorder: SnapshotRecorder | None = None,
+        profiler: SamplingProfiler | None = None,
     ) -> None:
         """
         Initializes a Simulator object.
         drawing_accuracy is the number of decimal places to round to when drawing the balls.
+        A headless simulator opens no window and is advanced with step() instead of start().
+        engine is "reference" to move BallObjects in Python, or "array" to use ArrayEngine.
+        broadphase is "quadrant" or "sweep", see ArrayEngine, and "sweep" needs the
+        array engine.
+        When analytics is supplied it is updated after every step.
+        When shared_memory is a name, every step is published to a shared memory segment
+        of that name, which other processes can map with shared_state.StateReader.
+        When pacer is supplied it decides how many steps run per rendered frame, how
+        often the simulation info is redrawn, and when the run ends.
+        The run also ends once length_of_simulation seconds of CPU time have been used.
+        When recorder is supplied every step is added to it, and it is closed by close().
+        When profiler is supplied it samples the thread that calls populate() until
+        close(), attributing the samples to the current step and phase of the loop.
         :param window_size: tuple[int, int]
         :param num_of_balls: int
         :param time_step: float
         :param drawing_accuracy: int
         :param length_of_simulation: float or None
         :param debug: bool
+        :param headless: bool
+        :param engine: str
+        :param broadphase: str
+        :param analytics: Analytics or None
+        :param shared_memory: str or None
+        :param pacer: FramePacer or None
+        :param recorder: SnapshotRecorder or None
+        :param profiler: SamplingProfiler or None
         """
         if not isinstance(window_size, tuple):
             raise TypeError("window_size parameter must be a tuple.")
@@ -243,8 +282,31 @@ class Simulator:
             raise TypeError("length_of_simulation parameter must be a float or None.")
         if not isinstance(debug, bool):
             raise TypeError("debug parameter must be a boolean.")
-
-        self.window = Window(window_size[0], window_size[1], drawing_accuracy)
+        if not isinstance(headless, bool):
+            raise TypeError("headless parameter must be a boolean.")
+        if engine not in ("reference", "array"):
+            raise ValueError('engine parameter must be "reference" or "array".')
+        if broadphase not in ("quadrant", "sweep"):
+            raise ValueError('broadphase parameter must be "quadrant" or "sweep".')
+        if broadphase == "sweep" and engine != "array":
+            raise ValueError('broadphase "sweep" needs engine "array".')
+        if not isinstance(analytics, (Analytics, type(None))):
+            raise TypeError("analytics parameter must be an Analytics object or None.")
+        if not isinstance(shared_memory, (str, type(None))):
+            raise TypeError("shared_memory parameter must be a string or None.")
+        if not isinstance(pacer, (FramePacer, type(None))):
+            raise TypeError("pacer parameter must be a FramePacer object or None.")
+        if not isinstance(recorder, (SnapshotRecorder, type(None))):
+            raise TypeError("recorder parameter must be a SnapshotRecorder or None.")
+        if not isinstance(profiler, (SamplingProfiler, type(None))):
+            raise TypeError("profiler parameter must be a SamplingProfiler or None.")
+
+        if headless:
+            self.window = None
+        else:
+            self.window = Window(window_size[0], window_size[1], drawing_accuracy)
+        self.width = window_size[0]
+        self.height = window_size[1]
         self.num_of_balls = num_of_balls
         # dict of lists representing the quadrants of the window
         # each list contains the balls in that quadrant
@@ -252,41 +314,400 @@ class Simulator:
         self.balls = {0: [], 1: [], 2: [], 3: [], 4: []}
         self.time = 0.0
         self.time_step = time_step
-        self.search_dist = max(self.window.width, self.window.height) / 2
+        self.search_dist = max(self.width, self.height) / 2
         self.length_of_simulation = length_of_simulation
-        self.pid = os.getpid()
         self.load_from_file = load_from_file
         self.save_to_file = save_to_file
+        # change to the file path where the balls are loaded from and saved to
+        self.ball_file = "balls.pkl"
         self.debug = debug
-
-    def start(self) -> None:
+        self.engine_type = engine
+        self.broadphase = broadphase
+        # created by populate() when engine is "array"
+        self.engine: ArrayEngine | None = None
+        self.analytics = analytics
+        self.shared_memory = shared_memory
+        # created by populate() when shared_memory is set
+        self.publisher: StatePublisher | None = None
+        self.step_count = 0
+        self.pacer = pacer
+        self.recorder = recorder
+        self.profiler = profiler
+        # phase of the simulation loop currently running, and when it began
+        self.phase = "headless" if headless else "setup"
+        self.phase_start = Timer.perf_counter()
+        # balls added and removed after every step, with engine "array"
+        self.emitters: list[Emitter] = []
+        self.sinks: list[Sink] = []
+        # built on the first spatial query and refit to later steps
+        self.spatial_index: KDTree | None = None
+        self.spatial_index_ids = np.zeros(0, dtype=np.int64)
+        self.spatial_index_step = -1
+        # ids of each pair of balls that collided and momentum given to each wall
+        # (right, top, left, bottom) in the last reference step
+        self.collided_pairs: list[tuple[int, int]] = []
+        self.wall_impulse = [0.0, 0.0, 0.0, 0.0]
+
+    def populate(self) -> None:
         """
-        Starts the simulation.
+        Fills the simulator with balls, either loaded from file or newly generated.
         :return: None
         """
-        step_count = 0
-        elapsed_time = 0.0
-        self.window.draw_border()
+        if self.profiler is not None:
+            self.profiler.attach(lambda: (self.step_count, self.phase))
         if self.load_from_file:
-            # change to the file path where the balls are saved
-            load_file = "balls.pkl"
-            self.balls = load(load_file)
+            self.balls = load(self.ball_file)
+            # balls saved before ids existed are numbered in file order
+            next_id = 0
+            for quadrant in self.balls:
+                for ball in self.balls[quadrant]:
+                    if getattr(ball, "ball_id", None) is None:
+                        ball.ball_id = next_id
+                    next_id = max(next_id, ball.ball_id) + 1
             if self.debug:
                 print("Loaded balls from file.")
         else:
             self.__generate_balls()
             if self.save_to_file:
-                # change to the file path where the balls will be saved
-                save_file = "balls.pkl"
-                save(self.balls, save_file)
+                save(self.balls, self.ball_file)
             if self.debug:
                 print("Ball generation complete.\nStarting simulation.")
 
-        while True:
-            begin_time = Timer.process_time()
-            if self.length_of_simulation is not None:
-                if Timer.process_time() >= self.length_of_simulation:
-                    os.kill(self.pid, 9)
+        if self.engine_type == "array":
+            self.engine = ArrayEngine(
+                self.balls,
+                (self.width, self.height),
+                self.time_step,
+                self.search_dist,
+                self.broadphase,
+            )
+
+        if self.shared_memory is not None:
+            snapshot = self.snapshot()
+            # leave room for balls added later, the segment grows if it runs out
+            self.publisher = StatePublisher(
+                self.shared_memory, max(2 * len(snapshot), 1)
+            )
+            self.publisher.publish(snapshot, self.step_count)
+
+        if self.recorder is not None:
+            self.recorder.add(self.snapshot(), self.step_count)
+
+    def step(self) -> None:
+        """
+        Advances the simulation by one time step without drawing anything.
+        :return: None
+        """
+        # the phase of the loop that runs the steps, restored at the end
+        outer_phase = self.phase
+        self.__enter_phase("physics")
+        if self.engine is None:
+            self.__move_balls()
+        else:
+            self.engine.step()
+            if len(self.emitters) > 0 or len(self.sinks) > 0:
+                self.__enter_phase("population")
+            for emitter in self.emitters:
+                position, velocity, diameter = emitter.emit(self.time_step)
+                self.engine.spawn(
+                    position, velocity, diameter, lifetime=emitter.lifetime
+                )
+            for sink in self.sinks:
+                self.engine.remove_in_rect(sink.lower, sink.upper)
+        self.time += self.time_step
+        self.step_count += 1
+
+        if self.analytics is not None:
+            self.__enter_phase("analytics")
+            if self.engine is None:
+                collided_pairs = np.array(self.collided_pairs, dtype=np.int64)
+                collided_pairs = collided_pairs.reshape(-1, 2)
+                wall_impulse = np.array(self.wall_impulse)
+            else:
+                collided_pairs = self.engine.collided_pairs
+                wall_impulse = self.engine.wall_impulse
+            self.analytics.update(
+                self.snapshot(), collided_pairs, wall_impulse, self.time_step
+            )
+
+        if self.publisher is not None:
+            self.__enter_phase("publish")
+            self.publisher.publish(self.snapshot(), self.step_count)
+
+        if self.recorder is not None:
+            self.__enter_phase("record")
+            self.recorder.add(self.snapshot(), self.step_count)
+        self.__enter_phase(outer_phase)
+
+    def __population_engine(self) -> ArrayEngine:
+        """
+        The engine whose balls can be added and removed at runtime.
+        :return: ArrayEngine
+        """
+        if self.engine is None:
+            raise RuntimeError(
+                'Changing the balls at runtime needs engine="array" and populate().'
+            )
+        return self.engine
+
+    def spawn_balls(
+        self,
+        position: np.ndarray,
+        velocity: np.ndarray,
+        diameter: np.ndarray,
+        colors: list[str | None] | None = None,
+        lifetime: float | np.ndarray = inf,
+    ) -> np.ndarray:
+        """
+        Adds balls to the running simulation.
+        :param position: np.ndarray of shape (m, 2)
+        :param velocity: np.ndarray of shape (m, 2)
+        :param diameter: np.ndarray of shape (m,) of ints
+        :param colors: list of str or None, or None for random colors
+        :param lifetime: float or np.ndarray of shape (m,), time before removal
+        :return: np.ndarray of the ids of the new balls
+        """
+        ids = self.__population_engine().spawn(
+            position, velocity, diameter, colors, lifetime
+        )
+        # the spatial index no longer holds the same balls
+        self.spatial_index_step = -1
+        return ids
+
+    def remove_balls(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Removes balls from the running simulation by id.
+        :param ids: np.ndarray of ball ids
+        :return: np.ndarray of the ids removed
+        """
+        removed = self.__population_engine().remove(ids)
+        self.spatial_index_step = -1
+        return removed
+
+    def remove_balls_in_rect(
+        self, lower: tuple[float, float], upper: tuple[float, float]
+    ) -> np.ndarray:
+        """
+        Removes every ball whose center is inside an axis-aligned rectangle.
+        :param lower: tuple[float, float], the bottom left corner
+        :param upper: tuple[float, float], the top right corner
+        :return: np.ndarray of the ids removed
+        """
+        if not isinstance(lower, tuple) or not isinstance(upper, tuple):
+            raise TypeError("lower and upper parameters must be tuples.")
+        removed = self.__population_engine().remove_in_rect(lower, upper)
+        self.spatial_index_step = -1
+        return removed
+
+    def add_emitter(self, emitter: Emitter) -> None:
+        """
+        Adds an emitter that spawns balls after every step.
+        :param emitter: Emitter
+        :return: None
+        """
+        if not isinstance(emitter, Emitter):
+            raise TypeError("emitter parameter must be an Emitter.")
+        self.__population_engine()
+        self.emitters.append(emitter)
+
+    def add_sink(self, sink: Sink) -> None:
+        """
+        Adds a sink that removes balls after every step.
+        :param sink: Sink
+        :return: None
+        """
+        if not isinstance(sink, Sink):
+            raise TypeError("sink parameter must be a Sink.")
+        self.__population_engine()
+        self.sinks.append(sink)
+
+    def close(self) -> None:
+        """
+        Flushes what the simulation records, then releases the resources it holds,
+        such as the shared memory segment.
+        :return: None
+        """
+        if self.save_to_file:
+            save(self.current_balls(), self.ball_file)
+        if self.analytics is not None and self.analytics.dump_file is not None:
+            self.analytics.dump(self.analytics.dump_file)
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.publisher is not None:
+            self.publisher.close()
+            self.publisher = None
+        if self.profiler is not None:
+            self.profiler.close()
+
+    def snapshot(self) -> Snapshot:
+        """
+        The current state of every ball as arrays.
+        :return: Snapshot
+        """
+        if self.engine is None:
+            return Snapshot.from_balls(self.balls)
+        return self.engine.snapshot()
+
+    def __spatial_index(self) -> tuple[KDTree, np.ndarray]:
+        """
+        Brings the spatial index up to date with the current step. The tree is refit
+        when the balls are in the same order as when it was built, and rebuilt
+        otherwise.
+        :return: tuple of KDTree and the ball id of each point in it
+        """
+        if self.spatial_index_step != self.step_count or self.spatial_index is None:
+            snapshot = self.snapshot()
+            if self.spatial_index is None:
+                self.spatial_index = KDTree(snapshot.position)
+            elif np.array_equal(snapshot.ids, self.spatial_index_ids):
+                self.spatial_index.update(snapshot.position)
+            else:
+                self.spatial_index.rebuild(snapshot.position)
+            self.spatial_index_ids = snapshot.ids.copy()
+            self.spatial_index_step = self.step_count
+        return self.spatial_index, self.spatial_index_ids
+
+    def nearest(
+        self, pos: tuple[float, float] | np.ndarray, k: int = 1
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k balls whose centers are closest to each position.
+        :param pos: tuple[float, float] or np.ndarray of shape (m, 2)
+        :param k: int
+        :return: tuple of ball ids and distances, both of shape (m, k)
+        """
+        if not isinstance(pos, (tuple, np.ndarray)):
+            raise TypeError("pos parameter must be a tuple or a NumPy array.")
+
+        tree, ids = self.__spatial_index()
+        index, distance = tree.nearest(np.asarray(pos, dtype=np.float64), k)
+        return ids[index], distance
+
+    def within_radius(
+        self, pos: tuple[float, float] | np.ndarray, radius: float
+    ) -> list[np.ndarray]:
+        """
+        Finds the balls whose centers are within radius of each position.
+        :param pos: tuple[float, float] or np.ndarray of shape (m, 2)
+        :param radius: float
+        :return: list of m arrays of ball ids, closest first
+        """
+        if not isinstance(pos, (tuple, np.ndarray)):
+            raise TypeError("pos parameter must be a tuple or a NumPy array.")
+        if not isinstance(radius, (int, float)):
+            raise TypeError("radius parameter must be an int or float.")
+
+        tree, ids = self.__spatial_index()
+        return [
+            ids[index]
+            for index in tree.within_radius(np.asarray(pos, dtype=np.float64), radius)
+        ]
+
+    def in_rect(
+        self,
+        lower: tuple[float, float] | np.ndarray,
+        upper: tuple[float, float] | np.ndarray,
+    ) -> list[np.ndarray]:
+        """
+        Finds the balls whose centers are inside each axis-aligned rectangle.
+        :param lower: tuple[float, float] or np.ndarray of shape (m, 2), bottom left
+        :param upper: tuple[float, float] or np.ndarray of shape (m, 2), top right
+        :return: list of m arrays of ball ids
+        """
+        if not isinstance(lower, (tuple, np.ndarray)):
+            raise TypeError("lower parameter must be a tuple or a NumPy array.")
+        if not isinstance(upper, (tuple, np.ndarray)):
+            raise TypeError("upper parameter must be a tuple or a NumPy array.")
+
+        tree, ids = self.__spatial_index()
+        return [ids[index] for index in tree.in_rect(lower, upper)]
+
+    def current_balls(self) -> dict[int, list[BallObject]]:
+        """
+        The current balls as quadrant lists of BallObjects.
+        :return: dict of lists of BallObjects (quadrants)
+        """
+        if self.engine is None:
+            return self.balls
+        return self.engine.to_balls()
+
+    def start(self) -> None:
+        """
+        Starts the simulation.
+        :return: None
+        """
+        if self.window is None:
+            raise RuntimeError("A headless simulator cannot be started, use step().")
+
+        elapsed_time = 0.0
+        self.window.draw_border()
+        self.populate()
+        if self.pacer is not None:
+            self.pacer.start()
+
+        try:
+            while not self.__finished():
+                begin_time = Timer.process_time()
+                self.__enter_phase("hud")
+                if self.pacer is None or self.pacer.hud_due():
+                    self.__draw_sim_info(elapsed_time)
+                self.__enter_phase("draw")
+                self.window.draw_border()
+                self.window.draw_axis()
+                self.__draw_all_balls()
+                self.window.screen.update()
+                self.__enter_phase("steps")
+                steps = 1 if self.pacer is None else self.pacer.steps_per_frame
+                steps_start = Timer.perf_counter()
+                for _ in range(steps):
+                    self.step()
+                if self.pacer is not None:
+                    self.pacer.record(
+                        "steps", Timer.perf_counter() - steps_start, steps
+                    )
+                end_time = Timer.process_time()
+                self.__enter_phase("save")
+                self.window.turtle.clear()
+                elapsed_time = end_time - begin_time
+                if self.save_to_file:
+                    save(self.current_balls(), self.ball_file)
+                self.__enter_phase("pacing")
+                if self.pacer is not None:
+                    self.pacer.end_frame()
+        finally:
+            self.__enter_phase("close")
+            self.close()
+
+    def __finished(self) -> bool:
+        """
+        Whether the run has reached its CPU time limit or the pacer's deadline.
+        :return: bool
+        """
+        if self.length_of_simulation is not None:
+            if Timer.process_time() >= self.length_of_simulation:
+                return True
+        return self.pacer is not None and self.pacer.expired()
+
+    def __enter_phase(self, phase: str) -> None:
+        """
+        Marks the start of a phase of the simulation, giving the time spent in the
+        previous phase to the pacer. The profiler reads the current phase.
+        :param phase: str
+        :return: None
+        """
+        now = Timer.perf_counter()
+        if self.pacer is not None:
+            self.pacer.record(self.phase, now - self.phase_start)
+        self.phase = phase
+        self.phase_start = now
+
+    def __draw_sim_info(self, elapsed_time: float) -> None:
+        """
+        Draws the step count, iteration time, number of balls and their memory usage.
+        :param elapsed_time: float
+        :return: None
+        """
+        if self.engine is None:
             num_of_balls = sum(len(self.balls[quadrant]) for quadrant in self.balls)
             ball_memory = sum(
                 (
@@ -295,19 +716,10 @@ class Simulator:
                     for ball in self.balls[quadrant]
                 )
             )
-            self.window.sim_info(step_count, elapsed_time, num_of_balls, ball_memory)
-            self.window.draw_border()
-            self.window.draw_axis()
-            self.__draw_all_balls()
-            self.window.screen.update()
-            self.__move_balls()
-            end_time = Timer.process_time()
-            self.window.turtle.clear()
-            self.time += self.time_step
-            step_count += 1
-            elapsed_time = end_time - begin_time
-            if self.save_to_file:
-                save(self.balls, save_file)
+        else:
+            num_of_balls = self.engine.count
+            ball_memory = self.engine.nbytes()
+        self.window.sim_info(self.step_count, elapsed_time, num_of_balls, ball_memory)
 
     def __move_balls(self) -> None:
         """
@@ -317,6 +729,8 @@ class Simulator:
         # tuple of lists representing the quadrants of the window
         # each list contains the balls in that quadrant
         new_balls = {0: [], 1: [], 2: [], 3: [], 4: []}
+        self.collided_pairs = []
+        self.wall_impulse = [0.0, 0.0, 0.0, 0.0]
 
         # list of tuples representing pairs of
         # balls that have collided
@@ -344,6 +758,7 @@ class Simulator:
                     quadrant[0].diameter,
                     new_quadrant,
                     quadrant[0].color,
+                    quadrant[0].ball_id,
                 )
                 new_balls[new_quadrant].append(new_ball)
                 continue
@@ -366,7 +781,12 @@ class Simulator:
                     new_pos = (ball1_new_x, ball1_new_y)
                     new_quadrant = Simulator.__get_quadrant(new_pos, None)
                     new_ball = BallObject(
-                        new_pos, ball1_new_vel, ball.diameter, new_quadrant, ball.color
+                        new_pos,
+                        ball1_new_vel,
+                        ball.diameter,
+                        new_quadrant,
+                        ball.color,
+                        ball.ball_id,
                     )
                     new_balls[new_quadrant].append(new_ball)
                     continue
@@ -388,7 +808,12 @@ class Simulator:
                     new_pos = (ball1_new_x, ball1_new_y)
                     new_quadrant = Simulator.__get_quadrant(new_pos, None)
                     new_ball = BallObject(
-                        new_pos, ball1_new_vel, ball.diameter, new_quadrant, ball.color
+                        new_pos,
+                        ball1_new_vel,
+                        ball.diameter,
+                        new_quadrant,
+                        ball.color,
+                        ball.ball_id,
                     )
                     new_balls[new_quadrant].append(new_ball)
 
@@ -400,6 +825,7 @@ class Simulator:
 
                 ball1 = pair[0]
                 ball2 = pair[1]
+                self.collided_pairs.append((ball1.ball_id, ball2.ball_id))
 
                 ball1_new_vel = Simulator.__ball_to_ball_physics(ball1, ball2)
                 ball2_new_vel = Simulator.__ball_to_ball_physics(ball2, ball1)
@@ -421,6 +847,7 @@ class Simulator:
                         ball1.diameter,
                         new_quadrant1,
                         ball1.color,
+                        ball1.ball_id,
                     )
                 )
 
@@ -432,6 +859,7 @@ class Simulator:
                         ball2.diameter,
                         new_quadrant2,
                         ball2.color,
+                        ball2.ball_id,
                     )
                 )
 
@@ -451,9 +879,9 @@ class Simulator:
         """
 
         def generate_position(d: int) -> tuple[float, float]:
-            return random.uniform(
-                -self.window.width + d / 2, self.window.width - d / 2
-            ), random.uniform(-self.window.height + d / 2, self.window.height - d / 2)
+            return random.uniform(-self.width + d / 2, self.width - d / 2), random.uniform(
+                -self.height + d / 2, self.height - d / 2
+            )
 
         for ball_count in range(self.num_of_balls):
             # Generate a random position within the window
@@ -523,7 +951,9 @@ class Simulator:
             velocity = Vector2D(speed_x, speed_y)
 
             # Create a new ball object with the random position, velocity, diameter, and color
-            new_ball = BallObject(position, velocity, diameter, quadrant, color=None)
+            new_ball = BallObject(
+                position, velocity, diameter, quadrant, color=None, ball_id=ball_count
+            )
 
             # Add the new ball to its quadrant list
             self.balls[quadrant].append(new_ball)
@@ -542,11 +972,20 @@ class Simulator:
         new_speed_x = b.velocity.x
         new_speed_y = b.velocity.y
 
-        if x + b.radius >= self.window.width or x - b.radius <= -self.window.width:
+        if x + b.radius >= self.width or x - b.radius <= -self.width:
             new_speed_x *= -1
+            # momentum given to the wall, pointing out of the window
+            if x + b.radius >= self.width:
+                self.wall_impulse[0] += 2 * b.mass * b.velocity.x
+            else:
+                self.wall_impulse[2] -= 2 * b.mass * b.velocity.x
 
-        if y + b.radius >= self.window.height or y - b.radius <= -self.window.height:
+        if y + b.radius >= self.height or y - b.radius <= -self.height:
             new_speed_y *= -1
+            if y + b.radius >= self.height:
+                self.wall_impulse[1] += 2 * b.mass * b.velocity.y
+            else:
+                self.wall_impulse[3] -= 2 * b.mass * b.velocity.y
 
         return Vector2D(new_speed_x, new_speed_y)
 
@@ -555,5 +994,14 @@ class Simulator:
         Draws all balls in the window.
         :return: None
         """
+        if self.engine is not None:
+            for slot in self.engine.live().tolist():
+                self.window.draw_ball(
+                    tuple(self.engine.position[slot].tolist()),
+                    int(self.engine.diameter[slot]),
+                    self.engine.colors[slot],
+                )
+            return
+
         for b in [ball for quadrant in self.balls for ball in self.balls[quadrant]]:
             self.window.draw_ball(b.position, b.diameter, b.color)
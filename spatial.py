@@ -0,0 +1,262 @@
+import numpy as np
+
+
+class KDTree:
+    """
+    A KD-tree over ball positions, answering many queries at once.
+
+    Every node covers a contiguous range of the permuted points and stores their
+    bounding box. When the points move, refit() recomputes the boxes without
+    changing the tree; rebuild() is only needed when the boxes have grown too loose.
+    """
+
+    def __init__(self, position: np.ndarray, leaf_size: int = 16) -> None:
+        """
+        Build a new tree over the specified positions.
+        :param position: np.ndarray of shape (n, 2)
+        :param leaf_size: int
+        :return: None
+        """
+        if not isinstance(position, np.ndarray):
+            raise TypeError("position parameter must be a NumPy array.")
+        if not isinstance(leaf_size, int):
+            raise TypeError("leaf_size parameter must be an integer.")
+        if leaf_size < 1:
+            raise ValueError("leaf_size parameter must be positive.")
+
+        self.leaf_size = leaf_size
+        self.rebuild(position)
+
+    def rebuild(self, position: np.ndarray) -> None:
+        """
+        Build the tree again from scratch.
+        :param position: np.ndarray of shape (n, 2)
+        :return: None
+        """
+        self.position = np.asarray(position, dtype=np.float64).reshape(-1, 2)
+        count = len(self.position)
+        self.order = np.arange(count)
+        # per node: range of self.order covered, children and split
+        start = [0]
+        end = [count]
+        left = [-1]
+        right = [-1]
+        split_axis = [0]
+        split_value = [0.0]
+        depth = [0]
+
+        node = 0
+        while node < len(start):
+            lo, hi = start[node], end[node]
+            if hi - lo > self.leaf_size:
+                points = self.position[self.order[lo:hi]]
+                axis = int(np.argmax(np.ptp(points, axis=0)))
+                middle = (hi - lo) // 2
+                part = np.argpartition(points[:, axis], middle)
+                self.order[lo:hi] = self.order[lo:hi][part]
+                split_axis[node] = axis
+                split_value[node] = float(points[part[middle], axis])
+                for child_start, child_end in ((lo, lo + middle), (lo + middle, hi)):
+                    start.append(child_start)
+                    end.append(child_end)
+                    left.append(-1)
+                    right.append(-1)
+                    split_axis.append(0)
+                    split_value.append(0.0)
+                    depth.append(depth[node] + 1)
+                left[node] = len(start) - 2
+                right[node] = len(start) - 1
+            node += 1
+
+        self.start = np.array(start, dtype=np.int64)
+        self.end = np.array(end, dtype=np.int64)
+        self.left = np.array(left, dtype=np.int64)
+        self.right = np.array(right, dtype=np.int64)
+        self.split_axis = np.array(split_axis, dtype=np.int64)
+        self.split_value = np.array(split_value, dtype=np.float64)
+        self.depth = np.array(depth, dtype=np.int64)
+        self.refit(self.position)
+        self.built_area = self.leaf_area()
+
+    def refit(self, position: np.ndarray) -> None:
+        """
+        Recompute the bounding boxes for moved points, keeping the tree shape.
+        The points must be in the same order as when the tree was built.
+        :param position: np.ndarray of shape (n, 2)
+        :return: None
+        """
+        position = np.asarray(position, dtype=np.float64).reshape(-1, 2)
+        if len(position) != len(self.order):
+            raise ValueError("Cannot refit a tree to a different number of points.")
+
+        self.position = position
+        nodes = len(self.start)
+        self.lower = np.full((nodes, 2), np.inf)
+        self.upper = np.full((nodes, 2), -np.inf)
+        leaves = np.flatnonzero((self.left < 0) & (self.end > self.start))
+        # reduceat needs the leaf ranges in order, and leaves at different depths
+        # are not numbered in that order
+        leaves = leaves[np.argsort(self.start[leaves])]
+        if len(leaves) > 0:
+            ordered = self.position[self.order]
+            self.lower[leaves] = np.minimum.reduceat(ordered, self.start[leaves])
+            self.upper[leaves] = np.maximum.reduceat(ordered, self.start[leaves])
+        # merge the boxes of the children one level at a time, from the bottom up
+        for level in range(int(self.depth.max()), -1, -1):
+            inner = np.flatnonzero((self.depth == level) & (self.left >= 0))
+            left, right = self.left[inner], self.right[inner]
+            self.lower[inner] = np.minimum(self.lower[left], self.lower[right])
+            self.upper[inner] = np.maximum(self.upper[left], self.upper[right])
+
+    def update(self, position: np.ndarray, slack: float = 2.0) -> None:
+        """
+        Refit the tree to moved points, rebuilding it if the leaf boxes have grown to
+        more than slack times their area when the tree was built.
+        :param position: np.ndarray of shape (n, 2)
+        :param slack: float
+        :return: None
+        """
+        if len(position) != len(self.order):
+            self.rebuild(position)
+            return
+        self.refit(position)
+        if self.leaf_area() > slack * max(self.built_area, 1e-12):
+            self.rebuild(position)
+
+    def leaf_area(self) -> float:
+        """
+        Total area of the leaf bounding boxes, a measure of how tight the tree is.
+        :return: float
+        """
+        leaves = (self.left < 0) & (self.end > self.start)
+        sides = self.upper[leaves] - self.lower[leaves]
+        return float(np.sum(sides[:, 0] * sides[:, 1]))
+
+    def __candidates(
+        self, lower: np.ndarray, upper: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find every point in a leaf whose box overlaps the query box, for many boxes.
+        :param lower: np.ndarray of shape (m, 2)
+        :param upper: np.ndarray of shape (m, 2)
+        :return: tuple of query indices and point indices, one entry per candidate
+        """
+        query = np.arange(len(lower))
+        node = np.zeros(len(lower), dtype=np.int64)
+        leaf_query = []
+        leaf_node = []
+        while len(query) > 0:
+            overlap = np.all(
+                (self.lower[node] <= upper[query]) & (self.upper[node] >= lower[query]),
+                axis=1,
+            )
+            query = query[overlap]
+            node = node[overlap]
+            leaf = self.left[node] < 0
+            leaf_query.append(query[leaf])
+            leaf_node.append(node[leaf])
+            query = np.repeat(query[~leaf], 2)
+            node = np.stack([self.left[node[~leaf]], self.right[node[~leaf]]], axis=1)
+            node = node.reshape(-1)
+
+        query = np.concatenate(leaf_query)
+        node = np.concatenate(leaf_node)
+        sizes = self.end[node] - self.start[node]
+        query = np.repeat(query, sizes)
+        offset = np.arange(len(query)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        return query, self.order[np.repeat(self.start[node], sizes) + offset]
+
+    def __within(
+        self, points: np.ndarray, radius: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every point within radius of each query point, sorted by query then distance.
+        :param points: np.ndarray of shape (m, 2)
+        :param radius: np.ndarray of shape (m,)
+        :return: tuple of indices, distances and the number of points per query
+        """
+        query, index = self.__candidates(
+            points - radius[:, None], points + radius[:, None]
+        )
+        distance = np.hypot(*(self.position[index] - points[query]).T)
+        keep = distance <= radius[query]
+        query, index, distance = query[keep], index[keep], distance[keep]
+        order = np.lexsort((distance, query))
+        return index[order], distance[order], np.bincount(query, minlength=len(points))
+
+    def within_radius(self, points: np.ndarray, radius: float) -> list[np.ndarray]:
+        """
+        Indices of the points within radius of each query point.
+        :param points: np.ndarray of shape (m, 2)
+        :param radius: float or np.ndarray of shape (m,)
+        :return: list of m arrays of indices, sorted by distance
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), len(points))
+        index, _, counts = self.__within(points, radius)
+        return np.split(index, np.cumsum(counts)[:-1])
+
+    def in_rect(self, lower: np.ndarray, upper: np.ndarray) -> list[np.ndarray]:
+        """
+        Indices of the points inside each axis-aligned rectangle.
+        :param lower: np.ndarray of shape (m, 2), the bottom left corners
+        :param upper: np.ndarray of shape (m, 2), the top right corners
+        :return: list of m arrays of indices
+        """
+        lower = np.asarray(lower, dtype=np.float64).reshape(-1, 2)
+        upper = np.asarray(upper, dtype=np.float64).reshape(-1, 2)
+        if len(lower) != len(upper):
+            raise ValueError("There must be as many lower as upper corners.")
+
+        query, index = self.__candidates(lower, upper)
+        inside = np.all(
+            (self.position[index] >= lower[query])
+            & (self.position[index] <= upper[query]),
+            axis=1,
+        )
+        query, index = query[inside], index[inside]
+        order = np.argsort(query, kind="stable")
+        return np.split(
+            index[order], np.cumsum(np.bincount(query, minlength=len(lower)))[:-1]
+        )
+
+    def nearest(self, points: np.ndarray, k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The k points closest to each query point.
+        :param points: np.ndarray of shape (m, 2)
+        :param k: int
+        :return: tuple of indices and distances, both of shape (m, k)
+        """
+        if not isinstance(k, int):
+            raise TypeError("k parameter must be an integer.")
+        if not 1 <= k <= len(self.order):
+            raise ValueError("k parameter must be between 1 and the number of points.")
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        # descend to the smallest node holding at least k points around each query,
+        # the distance to its k-th closest point bounds the search radius
+        node = np.zeros(len(points), dtype=np.int64)
+        while True:
+            inner = self.left[node] >= 0
+            go_left = (
+                points[np.arange(len(points)), self.split_axis[node]]
+                <= self.split_value[node]
+            )
+            child = np.where(go_left, self.left[node], self.right[node])
+            descend = inner & (self.end[child] - self.start[child] >= k)
+            if not descend.any():
+                break
+            node = np.where(descend, child, node)
+
+        sizes = self.end[node] - self.start[node]
+        query = np.repeat(np.arange(len(points)), sizes)
+        offset = np.arange(len(query)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        index = self.order[np.repeat(self.start[node], sizes) + offset]
+        distance = np.hypot(*(self.position[index] - points[query]).T)
+        order = np.lexsort((distance, query))
+        kth = np.cumsum(sizes) - sizes + k - 1
+        radius = distance[order][kth]
+
+        index, distance, counts = self.__within(points, radius)
+        first = (np.cumsum(counts) - counts)[:, None] + np.arange(k)
+        return index[first], distance[first]
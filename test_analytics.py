@@ -0,0 +1,133 @@
+import random
+
+import numpy as np
+import pytest
+
+from analytics import Analytics, RunningStatistic
+from engine import ArrayEngine, Snapshot
+from population import Emitter
+from simulator import Simulator
+
+
+def snapshot_of(velocity: np.ndarray) -> Snapshot:
+    count = len(velocity)
+    return Snapshot(
+        np.arange(count),
+        np.zeros((count, 2)),
+        np.asarray(velocity, dtype=np.float64),
+        np.full(count, 5.0),
+        np.full(count, 2.0),
+    )
+
+
+def test_running_statistic_matches_numpy() -> None:
+    values = np.random.default_rng(0).normal(3.0, 2.0, 1000)
+    single = RunningStatistic()
+    for value in values:
+        single.add(float(value))
+    batched = RunningStatistic()
+    for chunk in np.array_split(values, 7):
+        batched.add_batch(chunk)
+    batched.add_batch(np.zeros(0))
+
+    for statistic in (single, batched):
+        assert statistic.count == len(values)
+        assert statistic.mean == pytest.approx(values.mean())
+        assert statistic.variance == pytest.approx(values.var(ddof=1))
+
+
+def test_speed_histogram_and_statistics() -> None:
+    analytics = Analytics((100, 100), speed_bins=5, max_speed=50.0)
+    velocity = np.array([[0.0, 0.0], [3.0, 4.0], [0.0, 25.0], [60.0, 80.0]])
+    empty_pairs = np.zeros((0, 2), dtype=np.int64)
+    analytics.update(snapshot_of(velocity), empty_pairs, np.zeros(4), 0.1)
+    analytics.update(snapshot_of(velocity[:2]), empty_pairs, np.zeros(4), 0.1)
+
+    # bins of width 10, the speed of 100 is counted in the last bin
+    assert analytics.speed_histogram.tolist() == [4, 0, 1, 0, 1]
+    speeds = np.array([0.0, 5.0, 25.0, 100.0, 0.0, 5.0])
+    assert analytics.speed.count == 6
+    assert analytics.speed.mean == pytest.approx(speeds.mean())
+    assert analytics.speed.variance == pytest.approx(speeds.var(ddof=1))
+    energies = [0.5 * 2.0 * (25 + 625 + 10000), 0.5 * 2.0 * 25]
+    assert analytics.kinetic_energy.mean == pytest.approx(np.mean(energies))
+    assert analytics.momentum_x.mean == pytest.approx(np.mean([2.0 * 63, 2.0 * 3]))
+
+
+def test_wall_pressure_of_a_ball_bouncing_off_the_right_wall() -> None:
+    engine = ArrayEngine({}, (100, 50), 0.1)
+    engine.spawn(np.array([[95.0, 0.0]]), np.array([[10.0, 0.0]]), 10, ["red"])
+    analytics = Analytics((100, 50))
+    engine.step()
+    analytics.update(
+        engine.snapshot(), engine.collided_pairs, engine.wall_impulse, 0.1
+    )
+
+    impulse = 2 * engine.mass[0] * 10.0
+    # the right wall is 2 * height long
+    assert analytics.wall_pressure().tolist() == pytest.approx(
+        [impulse / (100 * 0.1), 0.0, 0.0, 0.0]
+    )
+    assert analytics.collisions == 0
+
+
+def test_collisions_are_counted_once_per_pair() -> None:
+    engine = ArrayEngine({}, (100, 100), 0.1)
+    # two pairs colliding head on, far from each other and from the walls
+    engine.spawn(
+        np.array([[20.0, 20.0], [28.0, 20.0], [-20.0, -20.0], [-28.0, -20.0]]),
+        np.array([[5.0, 0.0], [-5.0, 0.0], [-5.0, 0.0], [5.0, 0.0]]),
+        10,
+        ["red"] * 4,
+    )
+    analytics = Analytics((100, 100))
+    engine.step()
+    analytics.update(
+        engine.snapshot(), engine.collided_pairs, engine.wall_impulse, 0.1
+    )
+
+    assert analytics.collisions == 2
+    assert analytics.collisions_per_step.mean == 2.0
+    assert analytics.collision_rate() == pytest.approx(2 / 0.1)
+    assert analytics.summary()["ball_collisions"] == {0: 1, 1: 1, 2: 1, 3: 1}
+    assert analytics.quadrant_collisions.sum() == 4
+
+
+def test_engines_count_the_same_collisions() -> None:
+    counts = []
+    for engine in ("reference", "array"):
+        random.seed(0)
+        analytics = Analytics((200, 200))
+        simulator = Simulator(
+            (200, 200), 40, headless=True, engine=engine, analytics=analytics
+        )
+        simulator.populate()
+        for _ in range(100):
+            simulator.step()
+        counts.append(analytics.collisions)
+    assert counts[0] == counts[1] > 0
+
+
+def test_ball_collisions_only_hold_the_balls_alive() -> None:
+    analytics = Analytics((300, 300))
+    simulator = Simulator(
+        (300, 300), 20, headless=True, engine="array", analytics=analytics
+    )
+    simulator.populate()
+    simulator.add_emitter(
+        Emitter((-250.0, -250.0), (250.0, 250.0), 500.0, lifetime=0.5)
+    )
+    totals = {}
+    for _ in range(500):
+        simulator.step()
+        for first, second in simulator.engine.collided_pairs.tolist():
+            totals[first] = totals.get(first, 0) + 1
+            totals[second] = totals.get(second, 0) + 1
+
+    live = simulator.snapshot().ids
+    assert simulator.engine.next_id > 2000
+    assert sorted(analytics.ball_ids.tolist()) == sorted(live.tolist())
+    # the counts of the balls still alive were kept from step to step
+    assert analytics.summary()["ball_collisions"] == {
+        ball_id: totals[ball_id] for ball_id in live.tolist() if ball_id in totals
+    }
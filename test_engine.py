@@ -0,0 +1,84 @@
+import numpy as np
+
+from engine import ArrayEngine
+from harness import seeded_balls
+from population import Emitter, Sink
+from simulator import Simulator
+
+
+def empty_engine() -> ArrayEngine:
+    return ArrayEngine({}, (500, 500), 0.1)
+
+
+def spawn(engine: ArrayEngine, count: int, lifetime: float = np.inf) -> np.ndarray:
+    # far apart and slow, so nothing collides or reaches a wall
+    x = -400 + 40 * np.arange(count) % 800
+    position = np.stack([x, 40 * (np.arange(count) // 20) - 400], axis=1)
+    return engine.spawn(position, np.ones((count, 2)), 10, ["red"] * count, lifetime)
+
+
+def test_spawned_balls_get_new_ids_after_the_loaded_ones() -> None:
+    engine = ArrayEngine(seeded_balls(0, (500, 500), 20), (500, 500), 0.1)
+    ids = spawn(engine, 5)
+    assert ids.tolist() == list(range(20, 25))
+    assert engine.count == 25
+    assert sorted(engine.snapshot().ids.tolist()) == list(range(25))
+
+
+def test_removed_slots_are_reused_and_ids_are_not() -> None:
+    engine = empty_engine()
+    ids = spawn(engine, 10)
+    removed = engine.remove(np.array([3, 5, 5, 42, -1]))
+    assert removed.tolist() == [3, 5]
+    assert engine.count == 8
+    assert engine.remove(np.array([3])).tolist() == []
+
+    size = engine.size
+    new = spawn(engine, 2)
+    assert new.tolist() == [10, 11]
+    # the free slots were filled before the arrays
+    assert engine.size == size
+    assert engine.count == 10
+    snapshot = engine.snapshot()
+    expected = sorted(set(ids.tolist()) - {3, 5}) + [10, 11]
+    assert sorted(snapshot.ids.tolist()) == expected
+
+
+def test_remove_in_rect() -> None:
+    engine = empty_engine()
+    engine.spawn(
+        np.array([[0.0, 0.0], [100.0, 100.0], [-100.0, 50.0]]), np.zeros((3, 2)), 10
+    )
+    assert engine.remove_in_rect((-10.0, -10.0), (150.0, 150.0)).tolist() == [0, 1]
+    assert engine.snapshot().ids.tolist() == [2]
+
+
+def test_balls_are_removed_when_their_lifetime_runs_out() -> None:
+    engine = empty_engine()
+    short = spawn(engine, 3, lifetime=0.25)
+    long = spawn(engine, 3, lifetime=1.0)
+    for _ in range(3):
+        engine.step()
+    assert sorted(engine.snapshot().ids.tolist()) == long.tolist()
+    assert not set(short.tolist()) & set(engine.slots)
+    for _ in range(8):
+        engine.step()
+    assert engine.count == 0
+
+
+def test_id_tables_follow_the_live_balls() -> None:
+    simulator = Simulator((300, 300), 20, headless=True, engine="array")
+    simulator.populate()
+    simulator.add_emitter(
+        Emitter((-250.0, -250.0), (250.0, 250.0), 500.0, lifetime=0.5)
+    )
+    simulator.add_sink(Sink((-300.0, -300.0), (-200.0, 300.0)))
+    for _ in range(500):
+        simulator.step()
+    engine = simulator.engine
+    # thousands of balls have come and gone
+    assert engine.next_id > 2000
+    assert len(engine.slots) == engine.count
+    assert engine.capacity < 1000
+    for ball_id, slot in engine.slots.items():
+        assert engine.ids[slot] == ball_id
@@ -0,0 +1,104 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from batch import BatchEngine
+from engine import ArrayEngine
+from harness import HarnessReport, Tolerances, _aligned, compare_engines, seeded_balls
+
+# sparse scenes with few collisions and dense ones full of them
+SCENES = [((500, 500), 50), ((80, 80), 30)]
+
+
+@pytest.mark.parametrize("broadphase", ["quadrant", "sweep"])
+@pytest.mark.parametrize("window_size, num_of_balls", SCENES)
+@pytest.mark.parametrize("seed", range(3))
+def test_array_engine_matches_reference(
+    seed: int, window_size: tuple[int, int], num_of_balls: int, broadphase: str
+) -> None:
+    result = compare_engines(
+        partial(ArrayEngine, broadphase=broadphase),
+        seed=seed,
+        window_size=window_size,
+        num_of_balls=num_of_balls,
+    )
+    assert result.passed, str(result)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_broadphases_agree_in_crowded_scenes(seed: int) -> None:
+    result = compare_engines(
+        partial(ArrayEngine, broadphase="sweep"),
+        frames=300,
+        seed=seed,
+        window_size=(80, 80),
+        num_of_balls=40,
+        reference=partial(ArrayEngine, broadphase="quadrant"),
+    )
+    assert result.passed, str(result)
+
+
+def test_batch_engine_matches_array_engine_per_world() -> None:
+    # worlds of mixed sizes, crowding and time steps
+    sizes = [((500, 500), 50), ((80, 80), 30), ((200, 120), 20), ((60, 60), 5)]
+    time_steps = [0.1, 0.05, 0.02, 0.2, 0.1]
+    worlds = []
+    for world in range(40):
+        window_size, num_of_balls = sizes[world % len(sizes)]
+        worlds.append((world, window_size, num_of_balls, time_steps[world % 5]))
+
+    batch = BatchEngine(
+        [seeded_balls(seed, size, n) for seed, size, n, _ in worlds],
+        [size for _, size, _, _ in worlds],
+        [time_step for _, _, _, time_step in worlds],
+    )
+    engines = [
+        ArrayEngine(seeded_balls(seed, size, n), size, time_step)
+        for seed, size, n, time_step in worlds
+    ]
+    for frame in range(300):
+        batch.step()
+        for world, engine in enumerate(engines):
+            engine.step()
+            expected = _aligned(engine.snapshot())
+            actual = _aligned(batch.snapshot(world))
+            assert np.array_equal(actual.ids, expected.ids), (frame, world)
+            assert np.array_equal(actual.position, expected.position), (frame, world)
+            assert np.array_equal(actual.velocity, expected.velocity), (frame, world)
+            # summed in another order, so only up to rounding
+            assert np.allclose(batch.wall_impulse[world], engine.wall_impulse)
+
+
+def test_excuses_are_counted_and_limited() -> None:
+    report = HarnessReport(10)
+    report.frames_compared = 10
+    report.balls_compared = 100
+    report.reference_duplicates = [(2, [4]), (3, [4, 7])]
+    report.conservation_violations = [
+        (3, "reference", "momentum", 1e-3),
+        (3, "candidate", "momentum", 1e-3),
+        (5, "reference", "kinetic energy", 1e-3),
+        (5, "candidate", "kinetic energy", 1e-3),
+    ]
+    assert (report.excused_frames, report.excused_balls) == (3, 3)
+    assert report.passed
+    assert "3 frames and 3 balls" in str(report)
+
+    # more excused frames or balls than the tolerances allow
+    report.tolerances = Tolerances(excused_frames=0.2)
+    assert not report.passed
+    report.tolerances = Tolerances(excused_balls=0.02)
+    assert not report.passed
+
+
+def test_candidate_must_conserve_as_well_as_the_reference() -> None:
+    report = HarnessReport(10)
+    report.frames_compared = 10
+    report.balls_compared = 100
+    report.conservation_violations = [
+        (5, "reference", "momentum", 1e-6),
+        (5, "candidate", "momentum", 1e-3),
+    ]
+    assert report.excused_violations() == []
+    assert not report.passed
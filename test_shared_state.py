@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from engine import Snapshot
+from shared_state import StatePublisher, StateReader
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def balls(count: int, step: int) -> Snapshot:
+    ids = np.arange(count, dtype=np.int64)
+    return Snapshot(
+        ids,
+        np.stack([ids + step, -ids], axis=1).astype(np.float64),
+        np.ones((count, 2)),
+        np.full(count, 5.0),
+        np.full(count, 2.0),
+    )
+
+
+def follow(name: str, steps: int, ready) -> None:
+    """
+    Read frames until step steps - 1, checking each against balls().
+    """
+    reader = StateReader(name)
+    generations = set()
+    while True:
+        _, step, snapshot = reader.read()
+        if snapshot is not None:
+            expected = balls(len(snapshot), step)
+            assert np.array_equal(snapshot.ids, expected.ids)
+            assert np.array_equal(snapshot.position, expected.position)
+            generations.add(reader.attached)
+            ready.set()
+            if step == steps - 1:
+                break
+        time.sleep(0.001)
+    reader.close()
+    assert len(generations) > 1, generations
+
+
+def publish_with_reader(method: str, name: str) -> None:
+    """
+    Publish a growing number of balls, forcing a new generation, to a reader
+    started with the specified multiprocessing start method.
+    """
+    context = multiprocessing.get_context(method)
+    ready = context.Event()
+    publisher = StatePublisher(name, 4)
+    publisher.publish(balls(2, 0), 0)
+    reader = context.Process(target=follow, args=(name, 40, ready))
+    reader.start()
+    # grow past the first segment only once the reader has read from it
+    ready.wait(30)
+    for step in range(1, 40):
+        publisher.publish(balls(2 + step // 4, step), step)
+        time.sleep(0.002)
+    reader.join(30)
+    publisher.close()
+    assert reader.exitcode == 0
+
+
+def run(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True
+    )
+
+
+@pytest.mark.parametrize("method", multiprocessing.get_all_start_methods())
+def test_multiprocessing_reader_keeps_the_publisher_registration(method: str) -> None:
+    # run in a fresh interpreter so the resource tracker's complaints are captured
+    result = run(
+        "import test_shared_state as t; "
+        f"t.publish_with_reader({method!r}, 'test-shm-{method}-{os.getpid()}')"
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Traceback" not in result.stderr, result.stderr
+    assert "leaked" not in result.stderr, result.stderr
+
+
+def test_unrelated_reader_does_not_remove_the_segments() -> None:
+    name = f"test-shm-unrelated-{os.getpid()}"
+    publisher = StatePublisher(name, 4)
+    publisher.publish(balls(2, 0), 0)
+    publisher.publish(balls(10, 1), 1)
+    result = run(
+        "from shared_state import StateReader; "
+        f"reader = StateReader({name!r}); "
+        "frame, step, snapshot = reader.read(); "
+        "assert (step, len(snapshot), reader.attached) == (1, 10, 1); "
+        "reader.close()"
+    )
+    assert result.returncode == 0, result.stderr
+    assert "leaked" not in result.stderr, result.stderr
+    # the reader's resource tracker must not have removed them when it exited
+    publisher.publish(balls(30, 2), 2)
+    reader = StateReader(name)
+    frame, step, snapshot = reader.read()
+    assert (step, len(snapshot)) == (2, 30)
+    reader.close()
+    publisher.close()
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from population import Emitter
+from simulator import Simulator
+from spatial import KDTree
+
+# sizes around the ones where leaves end up at different depths
+SIZES = [1, 2, 16, 17, 33, 66, 100, 130, 132, 134, 258, 264, 270, 1000]
+
+
+def brute_nearest(position: np.ndarray, points: np.ndarray, k: int) -> np.ndarray:
+    distance = np.hypot(*(position[None, :, :] - points[:, None, :]).transpose(2, 0, 1))
+    return np.sort(distance, axis=1)[:, :k]
+
+
+def check_tree(tree: KDTree, position: np.ndarray, rng: np.random.Generator) -> None:
+    points = rng.uniform(-120, 120, (20, 2))
+    distance = np.hypot(*(position[None, :, :] - points[:, None, :]).transpose(2, 0, 1))
+
+    for k in sorted({1, min(5, len(position)), len(position)}):
+        index, found = tree.nearest(points, k)
+        assert np.allclose(found, brute_nearest(position, points, k))
+        assert np.allclose(
+            np.hypot(*(position[index] - points[:, None, :]).transpose(2, 0, 1)), found
+        )
+
+    for radius in (5.0, 20.0, 60.0):
+        for query, index in enumerate(tree.within_radius(points, radius)):
+            expected = np.flatnonzero(distance[query] <= radius)
+            assert sorted(index) == sorted(expected)
+            assert np.all(np.diff(distance[query, index]) >= 0)
+
+    lower = points - rng.uniform(0, 50, (20, 2))
+    upper = points + rng.uniform(0, 50, (20, 2))
+    for query, index in enumerate(tree.in_rect(lower, upper)):
+        inside = np.all((position >= lower[query]) & (position <= upper[query]), axis=1)
+        assert sorted(index) == sorted(np.flatnonzero(inside))
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_queries_match_brute_force(count: int) -> None:
+    rng = np.random.default_rng(count)
+    position = rng.uniform(-100, 100, (count, 2))
+    tree = KDTree(position)
+    check_tree(tree, position, rng)
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_queries_match_brute_force_after_refit(count: int) -> None:
+    rng = np.random.default_rng(count)
+    position = rng.uniform(-100, 100, (count, 2))
+    tree = KDTree(position)
+    for _ in range(3):
+        position = position + rng.normal(0, 5, position.shape)
+        tree.refit(position)
+        check_tree(tree, position, rng)
+    position = rng.uniform(-100, 100, (count, 2))
+    tree.update(position)
+    check_tree(tree, position, rng)
+
+
+def test_simulator_queries_follow_spawn_and_remove() -> None:
+    simulator = Simulator((200, 200), 30, headless=True, engine="array")
+    simulator.populate()
+    simulator.add_emitter(Emitter((-150.0, -150.0), (150.0, 150.0), 100.0))
+    rng = np.random.default_rng(0)
+    for step in range(60):
+        simulator.step()
+        if step % 7 == 0:
+            simulator.spawn_balls(
+                rng.uniform(-150, 150, (5, 2)),
+                rng.uniform(-20, 20, (5, 2)),
+                rng.integers(10, 16, 5),
+            )
+        if step % 11 == 0:
+            snapshot = simulator.snapshot()
+            simulator.remove_balls(snapshot.ids[:3])
+        snapshot = simulator.snapshot()
+        points = rng.uniform(-150, 150, (10, 2))
+        k = min(5, len(snapshot))
+        ids, distance = simulator.nearest(points, k)
+        assert np.allclose(distance, brute_nearest(snapshot.position, points, k))
+        within = simulator.within_radius(points, 40.0)
+        for point, found in zip(points, within):
+            near = np.hypot(*(snapshot.position - point).T) <= 40.0
+            assert sorted(found) == sorted(snapshot.ids[near])
+        lower, upper = points - 30.0, points + 30.0
+        for query, found in enumerate(simulator.in_rect(lower, upper)):
+            inside = np.all(
+                (snapshot.position >= lower[query])
+                & (snapshot.position <= upper[query]),
+                axis=1,
+            )
+            assert sorted(found) == sorted(snapshot.ids[inside])
+    simulator.close()
@@ -18,6 +18,8 @@ class Window:
             raise TypeError("Width, height, and drawing accuracy must be integers")
 
         self.turtle = turtle.Turtle()
+        # separate turtle for the simulation info, so it can be redrawn less often
+        self.hud = turtle.Turtle()
         self.screen = turtle.Screen()
         self.width = width
         self.height = height
@@ -34,6 +36,8 @@ class Window:
         self.screen.tracer(0)
         self.turtle.speed(0)
         self.turtle.hideturtle()
+        self.hud.speed(0)
+        self.hud.hideturtle()
 
     def draw_border(self) -> None:
         """
@@ -72,7 +76,7 @@ class Window:
         self, step: int, iteration_time: float, num_of_balls: int, memory_usage: int
     ) -> None:
         """
-        Display infomation about the simulation.
+        Display infomation about the simulation, replacing what was displayed before.
         :param: step: int
         :param: iteration_time: float
         :param: num_of_balls: int
@@ -86,24 +90,25 @@ class Window:
         if not isinstance(num_of_balls, int):
             raise TypeError("Number of balls must be an integer")
 
-        self.turtle.penup()
+        self.hud.clear()
+        self.hud.penup()
         # put the step count in the top left corner
-        self.turtle.goto(-self.width + 10, self.height - 20)
-        self.turtle.write(f"Step: {step}", font=("Arial", 12, "normal"))
+        self.hud.goto(-self.width + 10, self.height - 20)
+        self.hud.write(f"Step: {step}", font=("Arial", 12, "normal"))
         # put the iteration time below the step count
-        self.turtle.goto(-self.width + 10, self.height - 40)
-        self.turtle.write(
+        self.hud.goto(-self.width + 10, self.height - 40)
+        self.hud.write(
             f"Iteration Time: {round(iteration_time, 2)} ms",
             font=("Arial", 12, "normal"),
         )
         # put the number of balls below the iteration time
         # also put the amount of memory used by the balls
-        self.turtle.goto(-self.width + 10, self.height - 60)
-        self.turtle.write(
+        self.hud.goto(-self.width + 10, self.height - 60)
+        self.hud.write(
             f"Number of Balls: {num_of_balls}", font=("Arial", 12, "normal")
         )
-        self.turtle.goto(-self.width + 10, self.height - 80)
-        self.turtle.write(
+        self.hud.goto(-self.width + 10, self.height - 80)
+        self.hud.write(
             f"Memory Usage: {memory_usage} bytes", font=("Arial", 12, "normal")
         )
 